@@ -0,0 +1,39 @@
+"""Make users.created_at NOT NULL
+
+Revision ID: e2b7c5a9d184
+Revises: a6e3d9b2f714
+Create Date: 2026-10-17 18:12:40.281935
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7c5a9d184'
+down_revision: Union[str, None] = 'a6e3d9b2f714'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keyset pages order by (created_at, id) and skip NULLs; place undated rows first
+    op.execute(
+        "UPDATE users SET created_at = COALESCE(updated_at, '1970-01-01 00:00:00') "
+        "WHERE created_at IS NULL"
+    )
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.alter_column('created_at',
+               existing_type=sa.DateTime(),
+               server_default=sa.text('CURRENT_TIMESTAMP'),
+               nullable=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.alter_column('created_at',
+               existing_type=sa.DateTime(),
+               server_default=None,
+               nullable=True)
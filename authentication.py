@@ -1,5 +1,5 @@
 # routers/auth.py - Authentication Routes
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
@@ -9,9 +9,15 @@ from models import User
 import users
 from security import(
     verify_password, 
+    check_password,
     create_access_token,
      create_refresh_token, 
-     verify_token)
+     verify_token,
+     decode_token,
+     get_current_user)
+from revocation import revocation_store
+from rate_limit import login_rate_limiter
+from services import user_service
 from datetime import datetime, timedelta
 from fastapi.security import HTTPBearer
 
@@ -25,42 +31,32 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl='/auth/token')
 
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-):
-    """Get current authenticated user"""
-     # Import here to avoid circular imports
-    
-    user_id = verify_token(credentials.credentials)
-    user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
-    
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    
-    # Update last seen
-    user.last_seen_at = datetime.utcnow()
-    db.commit()
-    
-    return user
-
-
 @router.post("/register", response_model=UserResponse)
 def register(user: CreateUser, db: Session = Depends(get_db)):
     """Register a new user"""
-    return users.create_user(db, user)
+    return user_service.create_user(db, user)
 
 @router.post("/login", response_model=Token)
-def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+def login(
+    login_data: LoginRequest,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
     """Login user and return tokens"""
+    # Throttle before any query or bcrypt work is spent on the attempt
+    login_rate_limiter.check(
+        login_data.username_or_email,
+        request.client.host if request.client else None
+    )
+
     # Query user by email (assuming username_or_email is email)
     user = db.query(User).filter(User.email == login_data.username_or_email).first()
+    password_check = check_password(login_data.password, user.hashed_password) if user else None
     
     # Check if user exists and password is correct
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    if not password_check or not password_check.valid:
+        login_rate_limiter.record_failure(login_data.username_or_email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -74,6 +70,14 @@ def login(login_data: LoginRequest, db: Session = Depends(get_db)):
             detail="Account is deactivated"
         )
     
+    login_rate_limiter.record_success(login_data.username_or_email)
+    
+    # Upgrade hashes made with an outdated bcrypt cost after responding
+    if password_check.needs_rehash:
+        background_tasks.add_task(
+            user_service.rehash_password, user.id, user.hashed_password, login_data.password
+        )
+    
     # Create tokens
     access_token = create_access_token(data={"sub": str(user.id)})
     refresh_token = create_refresh_token(data={"sub": str(user.id)})
@@ -86,11 +90,25 @@ def login(login_data: LoginRequest, db: Session = Depends(get_db)):
 
 @router.post("/refresh", response_model=Token)
 def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
-    """Refresh access token"""
-    user_id = verify_token(refresh_token, "refresh")
-    user = users.get_user(db, user_id)
+    """Exchange a refresh token for new tokens; each refresh token works once"""
+    claims = decode_token(refresh_token, "refresh")
+
+    # Revoking is an insert keyed by jti, so a concurrent reuse of the same token loses
+    if (
+        claims.jti is None
+        or revocation_store.is_revoked(db, claims.jti)
+        or not revocation_store.revoke(
+            db, claims.jti, datetime.utcfromtimestamp(claims.exp), claims.user_id
+        )
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token has been revoked"
+        )
+
+    user = user_service.get_user_by_id(db, claims.user_id)
     
-    if not user:
+    if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
@@ -103,4 +121,4 @@ def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
         "access_token": access_token,
         "refresh_token": new_refresh_token,
         "token_type": "bearer"
-    }
\ No newline at end of file
+    }
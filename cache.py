@@ -0,0 +1,337 @@
+"""
+In-process caching primitives shared by the authentication and service layers.
+"""
+import asyncio
+import functools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a TTL."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a live entry, refreshing its LRU position."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store an entry; ttl overrides the cache default for this entry."""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class SingleFlight:
+    """
+    Share one in-flight computation between concurrent calls with the same key.
+
+    The first caller for a key runs the computation; callers arriving while
+    it is in flight wait for its result instead of repeating the work. The
+    shared state is a concurrent.futures.Future, so threadpool callers (do)
+    and event-loop callers (do_async) can coalesce onto each other's calls.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.flights = 0
+        self.coalesced = 0
+
+    def _join(self, key: Hashable):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.flights += 1
+            return future, True
+
+    def _settle(self, key: Hashable, future: Future, value: Any = None, error: Optional[BaseException] = None):
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn, or wait for the identical call already in flight (blocking)."""
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            value = fn()
+        except BaseException as exc:
+            self._settle(key, future, error=exc)
+            raise
+        self._settle(key, future, value)
+        return value
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable]) -> Any:
+        """Await fn(), or the identical call already in flight, without blocking the loop."""
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            value = await fn()
+        except BaseException as exc:
+            self._settle(key, future, error=exc)
+            raise
+        self._settle(key, future, value)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"in_flight": len(self._calls), "flights": self.flights, "coalesced": self.coalesced}
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class CachedQuery:
+    """
+    Cache for a service function called as fn(db, *args, **kwargs).
+
+    Results are keyed by the arguments after the session. An entry is fresh
+    for ttl seconds; with stale_ttl, an expired entry is still served for up
+    to stale_ttl more seconds while a single background refresh, on its own
+    session from session_factory, replaces it. invalidate() drops every
+    entry, including results still being computed from pre-write data.
+
+    A read replica may not have a write yet when invalidate() runs. So for
+    primary_window seconds after an invalidation, recomputes (including
+    background refreshes) run on a session from primary_session_factory
+    instead of the caller's replica session. A lagging replica therefore
+    cannot pin pre-write results for a whole TTL.
+
+    Concurrent misses for the same key are coalesced into one computation
+    (SingleFlight). Async callers use call_async with an AsyncSession; the
+    plain call is for threadpool code and does not coalesce when made from
+    the event loop thread (e.g. inside AsyncSession.run_sync), where waiting
+    would block the loop.
+    """
+
+    def __init__(
+        self,
+        fn: Callable,
+        ttl: float,
+        maxsize: int = 128,
+        stale_ttl: float = 0.0,
+        session_factory: Optional[Callable] = None,
+        primary_session_factory: Optional[Callable] = None,
+        primary_window: float = 0.0
+    ):
+        functools.update_wrapper(self, fn)
+        self.fn = fn
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl if session_factory is not None else 0.0
+        self.session_factory = session_factory
+        self.primary_session_factory = primary_session_factory
+        self.primary_window = primary_window if primary_session_factory is not None else 0.0
+        self._invalidated_at: Optional[float] = None
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl + self.stale_ttl)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._refreshing: set = set()
+        self._flight = SingleFlight()
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.primary_computes = 0
+
+    def _lookup(self, key, args, kwargs):
+        entry = self._cache.get(key)
+        if entry is None:
+            return _MISSING
+        value, fresh_until = entry
+        if fresh_until <= time.monotonic():
+            with self._lock:
+                self.stale_hits += 1
+            self._refresh_in_background(key, args, kwargs)
+        return value
+
+    def __call__(self, db, *args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        value = self._lookup(key, args, kwargs)
+        if value is not _MISSING:
+            return value
+        if _in_event_loop():
+            return self._compute_consistent(key, db, args, kwargs)
+        return self._flight.do(key, lambda: self._compute_consistent(key, db, args, kwargs))
+
+    async def call_async(self, db, *args, **kwargs):
+        """Cached call for an AsyncSession; the function runs through db.run_sync."""
+        key = (args, tuple(sorted(kwargs.items())))
+        value = self._lookup(key, args, kwargs)
+        if value is not _MISSING:
+            return value
+        return await self._flight.do_async(
+            key, lambda: db.run_sync(lambda session: self._compute(key, session, args, kwargs))
+        )
+
+    def _compute(self, key, db, args, kwargs):
+        generation = self._generation
+        value = self.fn(db, *args, **kwargs)
+        with self._lock:
+            # An invalidation while computing means the result may predate the write
+            if generation == self._generation:
+                self._cache.set(key, (value, time.monotonic() + self.ttl))
+        return value
+
+    def _recently_invalidated(self) -> bool:
+        invalidated_at = self._invalidated_at
+        return invalidated_at is not None and time.monotonic() - invalidated_at < self.primary_window
+
+    def _compute_consistent(self, key, db, args, kwargs):
+        """_compute on db, or on a primary session shortly after an invalidation."""
+        if not self._recently_invalidated():
+            return self._compute(key, db, args, kwargs)
+        primary = self.primary_session_factory()
+        try:
+            with self._lock:
+                self.primary_computes += 1
+            return self._compute(key, primary, args, kwargs)
+        finally:
+            primary.close()
+
+    def _refresh_in_background(self, key, args, kwargs) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            factory = self.primary_session_factory if self._recently_invalidated() else self.session_factory
+            db = factory()
+            try:
+                self._compute(key, db, args, kwargs)
+                with self._lock:
+                    self.refreshes += 1
+            except Exception:
+                logger.exception("Background refresh of %s failed", self.__name__)
+            finally:
+                db.close()
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f"refresh-{self.__name__}", daemon=True).start()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._invalidated_at = time.monotonic()
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._cache.stats(),
+                "ttl": self.ttl,
+                "stale_ttl": self.stale_ttl,
+                "stale_hits": self.stale_hits,
+                "refreshes": self.refreshes,
+                "primary_computes": self.primary_computes,
+                **self._flight.stats(),
+            }
+
+
+_query_groups: Dict[str, List[CachedQuery]] = {}
+
+
+def cached_query(
+    group: str,
+    ttl: float,
+    maxsize: int = 128,
+    stale_ttl: float = 0.0,
+    session_factory: Optional[Callable] = None,
+    primary_session_factory: Optional[Callable] = None,
+    primary_window: float = 0.0
+) -> Callable[[Callable], CachedQuery]:
+    """Decorate a service function with a CachedQuery registered under group."""
+    def decorator(fn: Callable) -> CachedQuery:
+        cached = CachedQuery(
+            fn, ttl, maxsize, stale_ttl, session_factory, primary_session_factory, primary_window
+        )
+        _query_groups.setdefault(group, []).append(cached)
+        return cached
+    return decorator
+
+
+def invalidate_query_group(group: str) -> None:
+    """Drop every cached result of the functions registered under group."""
+    for cached in _query_groups.get(group, []):
+        cached.invalidate()
+
+
+def query_group_stats(group: str) -> Dict[str, Dict[str, Any]]:
+    """Per-function cache statistics for group."""
+    return {cached.__name__: cached.stats() for cached in _query_groups.get(group, [])}
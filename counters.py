@@ -0,0 +1,154 @@
+"""
+Incrementally maintained dashboard counters.
+
+dashboard_counters holds the number of users per (role, department,
+is_active). ORM events on User adjust the matching rows inside the same
+transaction as the user write, so the dashboard reads a handful of rows
+instead of scanning users. Writes that bypass the ORM (bulk inserts, Core
+updates, manual SQL) are corrected by a full reconciliation every
+COUNTER_RECONCILE_SECONDS.
+"""
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import delete, event, func, inspect, insert, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from database import engine
+from models import DashboardCounter, User
+from periodic import PeriodicTask
+
+
+logger = logging.getLogger(__name__)
+
+COUNTER_RECONCILE_SECONDS = float(os.getenv("COUNTER_RECONCILE_SECONDS", "3600"))
+
+CounterKey = Tuple[str, str, bool]
+
+
+def _value(value) -> str:
+    return getattr(value, "value", value) or ""
+
+
+def counter_key(role, department, is_active) -> CounterKey:
+    """dashboard_counters key; departments are "" and is_active defaults to True when unset."""
+    return _value(role), _value(department), True if is_active is None else bool(is_active)
+
+
+def increment_row(connection, table, key: Dict[str, Any], deltas: Dict[str, Any]) -> None:
+    """Add deltas to the row of table identified by key, creating it if missing."""
+    if connection.dialect.name in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if connection.dialect.name == "postgresql" else sqlite.insert
+        statement = dialect_insert(table).values(**key, **deltas)
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=[table.c[name] for name in key],
+            set_={name: table.c[name] + statement.excluded[name] for name in deltas}
+        ))
+        return
+
+    result = connection.execute(
+        update(table).where(*(table.c[name] == value for name, value in key.items()))
+        .values({name: table.c[name] + delta for name, delta in deltas.items()})
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(table).values(**key, **deltas))
+
+
+def _adjust(connection, key: CounterKey, delta: int) -> None:
+    role, department, is_active = key
+    increment_row(
+        connection,
+        DashboardCounter.__table__,
+        {"role": role, "department": department, "is_active": is_active},
+        {"count": delta}
+    )
+
+
+def _previous_key(target: User) -> Optional[CounterKey]:
+    """Key before this flush, or None if none of the counted columns changed."""
+    state = inspect(target)
+    changed = False
+    previous = []
+    for name in ("role", "department", "is_active"):
+        history = state.attrs[name].history
+        if history.deleted:
+            changed = True
+            previous.append(history.deleted[0])
+        else:
+            previous.append(getattr(target, name))
+    return counter_key(*previous) if changed else None
+
+
+@event.listens_for(User, "after_insert")
+def _user_inserted(mapper, connection, target):
+    _adjust(connection, counter_key(target.role, target.department, target.is_active), 1)
+
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target):
+    previous = _previous_key(target)
+    current = counter_key(target.role, target.department, target.is_active)
+    if previous is not None and previous != current:
+        _adjust(connection, previous, -1)
+        _adjust(connection, current, 1)
+
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target):
+    _adjust(connection, counter_key(target.role, target.department, target.is_active), -1)
+
+
+class DashboardCounterStore:
+    """Periodic full reconciliation of dashboard_counters against users."""
+
+    def __init__(self, reconcile_interval: float = COUNTER_RECONCILE_SECONDS):
+        self.last_drift = 0
+        self._task = PeriodicTask("dashboard-counters-reconcile", reconcile_interval, self.reconcile)
+
+    def reconcile(self) -> int:
+        """Recount users and replace the counters; returns the total drift corrected."""
+        with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                # Hold off event-driven adjustments until the recount is in place;
+                # writers committing later apply their deltas on top of it
+                conn.execute(text("LOCK TABLE dashboard_counters IN EXCLUSIVE MODE"))
+
+            actual: Dict[CounterKey, int] = {}
+            rows = conn.execute(
+                select(User.role, User.department, User.is_active, func.count())
+                .group_by(User.role, User.department, User.is_active)
+            )
+            for role, department, is_active, count in rows:
+                key = counter_key(role, department, is_active)
+                actual[key] = actual.get(key, 0) + count
+
+            table = DashboardCounter.__table__
+            stored = {
+                (row.role, row.department, row.is_active): row.count
+                for row in conn.execute(select(table))
+            }
+
+            drift = sum(abs(actual.get(key, 0) - stored.get(key, 0)) for key in actual.keys() | stored.keys())
+            if drift:
+                conn.execute(delete(table))
+                if actual:
+                    conn.execute(insert(table), [
+                        {"role": role, "department": department, "is_active": is_active, "count": count}
+                        for (role, department, is_active), count in actual.items()
+                    ])
+                logger.warning("Reconciled dashboard counters, corrected drift of %d", drift)
+
+        self.last_drift = drift
+        return drift
+
+    def start(self) -> None:
+        """Start periodic reconciliation, running one right away."""
+        self._task.start()
+        self._task.trigger()
+
+    def stop(self) -> None:
+        self._task.stop(run_final=False)
+
+
+dashboard_counters = DashboardCounterStore()
@@ -0,0 +1,84 @@
+"""
+Sparse fieldsets for user list endpoints.
+
+?fields=first_name,last_name loads only those columns (load_only) and
+serializes through a response model trimmed to the same fields, so neither
+the query nor the JSON carries columns the client did not ask for.
+"""
+from functools import lru_cache
+from typing import List, Optional, Tuple, Type
+
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy.orm import load_only
+
+import models
+import schemas
+
+
+# UserResponse field -> User column
+USER_FIELDS = {
+    name: getattr(models.User, "dob" if name == "date_of_birth" else name)
+    for name in schemas.UserResponse.model_fields
+}
+# Always loaded: id identifies the row, created_at is the pagination key
+_ALWAYS_LOADED = (models.User.id, models.User.created_at)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Validate a comma-separated fields parameter; id is always included."""
+    if not fields:
+        return None
+    
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - USER_FIELDS.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed fields: {', '.join(USER_FIELDS)}"
+        )
+    requested.add("id")
+    # Canonical order, so equal field sets share one cached model
+    return tuple(name for name in USER_FIELDS if name in requested)
+
+
+def user_columns(fields: Optional[Tuple[str, ...]] = None) -> list:
+    """Labelled columns for a tuple-returning User query, plus the pagination key."""
+    names = fields or tuple(USER_FIELDS)
+    columns = [USER_FIELDS[name].label(name) for name in names]
+    for column in _ALWAYS_LOADED:
+        if column.key not in names:
+            columns.append(column)
+    return columns
+
+
+def user_load_options(fields: Tuple[str, ...]):
+    """load_only option restricting a User query to the requested columns."""
+    columns = {USER_FIELDS[name] for name in fields} | set(_ALWAYS_LOADED)
+    return load_only(*columns)
+
+
+@lru_cache(maxsize=128)
+def user_page_model(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """UserPage variant whose items only carry the given fields."""
+    item = create_model(
+        "UserResponse_" + "_".join(fields),
+        __config__=ConfigDict(from_attributes=True),
+        **{
+            name: (schemas.UserResponse.model_fields[name].annotation, schemas.UserResponse.model_fields[name])
+            for name in fields
+        }
+    )
+    return create_model(
+        "UserPage_" + "_".join(fields),
+        items=(List[item], ...),
+        next_cursor=(Optional[str], None)
+    )
+
+
+def render_user_page(page: dict, fields: Optional[Tuple[str, ...]]):
+    """Serialize a page through the trimmed model, or leave it to the route's response_model."""
+    if fields is None:
+        return page
+    model = user_page_model(fields)
+    return Response(content=model.model_validate(page).model_dump_json(), media_type="application/json")
@@ -0,0 +1,240 @@
+"""
+Password hashing executor - runs bcrypt off the request workers.
+
+bcrypt is deliberately slow, so hashing and verification are dispatched to a
+bounded process pool instead of blocking the thread that serves the request.
+The executor is pluggable (see HASH_EXECUTOR) and keeps queue-wait and
+hash-time metrics for the internal stats endpoint.
+"""
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+
+load_dotenv()
+HASH_EXECUTOR = os.getenv("HASH_EXECUTOR", "process")  # "process" or "inline"
+HASH_POOL_SIZE = int(os.getenv("HASH_POOL_SIZE", os.cpu_count() or 2))
+HASH_QUEUE_DEPTH = int(os.getenv("HASH_QUEUE_DEPTH", HASH_POOL_SIZE * 8))
+# bcrypt work factor; pick it with scripts/bench_bcrypt_cost.py
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+def _prepare_password(password: str) -> str:
+    """Reduce long passwords with SHA256 to stay within bcrypt's 72-byte limit."""
+    password_bytes = password.encode("utf-8")
+    if len(password_bytes) > 72:
+        return hashlib.sha256(password_bytes).hexdigest()
+    return password
+
+
+def hash_password_sync(password: str) -> str:
+    """Hash a password in the current process."""
+    return pwd_context.hash(_prepare_password(password))
+
+
+def verify_password_sync(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the current process."""
+    return pwd_context.verify(_prepare_password(plain_password), hashed_password)
+
+
+def check_password_sync(plain_password: str, hashed_password: str) -> Tuple[bool, bool]:
+    """Verify a password and report whether its hash uses outdated settings."""
+    valid = verify_password_sync(plain_password, hashed_password)
+    return valid, valid and pwd_context.needs_update(hashed_password)
+
+
+def _timed_call(fn: Callable, submitted_at: float, *args):
+    """Run fn inside the worker, returning (result, queue_wait, hash_time)."""
+    started_at = time.monotonic()
+    result = fn(*args)
+    return result, started_at - submitted_at, time.monotonic() - started_at
+
+
+class HashMetrics:
+    """Thread-safe counters for the hashing executor."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.hash_time_total = 0.0
+        self.hash_time_max = 0.0
+
+    def reject(self):
+        with self._lock:
+            self.rejected += 1
+
+    def adjust_in_flight(self, delta: int):
+        with self._lock:
+            self.in_flight += delta
+
+    def record(self, queue_wait: float, hash_time: float):
+        with self._lock:
+            self.completed += 1
+            self.queue_wait_total += queue_wait
+            self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+            self.hash_time_total += hash_time
+            self.hash_time_max = max(self.hash_time_max, hash_time)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            completed = self.completed or 1
+            return {
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "in_flight": self.in_flight,
+                "queue_wait_avg_ms": self.queue_wait_total / completed * 1000,
+                "queue_wait_max_ms": self.queue_wait_max * 1000,
+                "hash_time_avg_ms": self.hash_time_total / completed * 1000,
+                "hash_time_max_ms": self.hash_time_max * 1000,
+            }
+
+
+class HashExecutor:
+    """Base executor: runs hashing calls inline on the calling thread."""
+
+    name = "inline"
+
+    def __init__(self):
+        self.metrics = HashMetrics()
+
+    def submit(self, fn: Callable, *args) -> Future:
+        future = Future()
+        try:
+            result, queue_wait, hash_time = _timed_call(fn, time.monotonic(), *args)
+        except Exception as exc:
+            future.set_exception(exc)
+        else:
+            self.metrics.record(queue_wait, hash_time)
+            future.set_result(result)
+        return future
+
+    def run(self, fn: Callable, *args):
+        """Run fn and block the calling thread until it completes."""
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable, *args):
+        """Run fn without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self) -> Dict[str, float]:
+        return {"executor": self.name, **self.metrics.snapshot()}
+
+    def shutdown(self):
+        pass
+
+
+class ProcessPoolHashExecutor(HashExecutor):
+    """Executor backed by a process pool with a bounded queue."""
+
+    name = "process"
+
+    def __init__(self, max_workers: int = HASH_POOL_SIZE, queue_depth: int = HASH_QUEUE_DEPTH):
+        super().__init__()
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        # Slots for running plus queued jobs; beyond that callers get a 503
+        self._slots = threading.BoundedSemaphore(max_workers + queue_depth)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Create the pool lazily so importing the app does not fork workers
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def submit(self, fn: Callable, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            self.metrics.reject()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        self.metrics.adjust_in_flight(1)
+
+        try:
+            inner = self._get_pool().submit(_timed_call, fn, time.monotonic(), *args)
+        except Exception:
+            self._release()
+            raise
+
+        outer = Future()
+
+        def _done(done: Future):
+            self._release()
+            try:
+                result, queue_wait, hash_time = done.result()
+            except Exception as exc:
+                outer.set_exception(exc)
+            else:
+                self.metrics.record(queue_wait, hash_time)
+                outer.set_result(result)
+
+        inner.add_done_callback(_done)
+        return outer
+
+    def _release(self):
+        self._slots.release()
+        self.metrics.adjust_in_flight(-1)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            **super().stats(),
+            "max_workers": self.max_workers,
+            "queue_depth": self.queue_depth,
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+
+_executor: Optional[HashExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_hash_executor() -> HashExecutor:
+    """Get the configured hashing executor, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                if HASH_EXECUTOR == "inline":
+                    _executor = HashExecutor()
+                else:
+                    _executor = ProcessPoolHashExecutor()
+    return _executor
+
+
+def set_hash_executor(executor: HashExecutor) -> None:
+    """Replace the hashing executor (e.g. inline for tests and scripts)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None and _executor is not executor:
+            _executor.shutdown()
+        _executor = executor
+
+
+def shutdown_hash_executor() -> None:
+    """Stop the worker processes, if any were started."""
+    if _executor is not None:
+        _executor.shutdown()
@@ -0,0 +1,86 @@
+"""
+Internal Routes - Operational statistics for sizing and troubleshooting
+Only accessible by users with Headteacher role
+"""
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from roles.headteacher import require_headteacher_role
+from security import Principal
+from database import engine, pool_stats, replica_engines
+from hashing import get_hash_executor
+from revocation import revocation_store
+from rate_limit import login_rate_limiter
+from slow_query_log import slow_query_log
+from services import dashboard_service
+
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["Internal"]
+)
+
+
+@router.get("/hashing-stats")
+def get_hashing_stats(
+    current_user: Principal = Depends(require_headteacher_role)
+):
+    """Get password hashing executor queue-wait and hash-time metrics."""
+    return get_hash_executor().stats()
+
+
+@router.get("/revocation-stats")
+def get_revocation_stats(
+    current_user: Principal = Depends(require_headteacher_role)
+):
+    """Get refresh-token revocation filter statistics."""
+    return revocation_store.stats()
+
+
+@router.get("/login-rate-stats")
+def get_login_rate_stats(
+    current_user: Principal = Depends(require_headteacher_role)
+):
+    """Get login throttling counters, for sizing limits against bcrypt throughput."""
+    return login_rate_limiter.stats()
+
+
+@router.get("/db-pool")
+def get_db_pool_stats(
+    current_user: Principal = Depends(require_headteacher_role)
+):
+    """Get connection pool occupancy, checkout latency, waits, overflow and invalidations."""
+    return {
+        "primary": pool_stats(engine),
+        "replicas": [pool_stats(replica) for replica in replica_engines],
+    }
+
+
+@router.get("/dashboard-cache")
+def get_dashboard_cache_stats(
+    current_user: Principal = Depends(require_headteacher_role)
+):
+    """Get dashboard cache hits, misses, stale serves and background refreshes per function."""
+    return dashboard_service.dashboard_cache_stats()
+
+
+@router.get("/slow-queries")
+def get_slow_queries(
+    limit: int = Query(20, ge=1, le=200),
+    order_by: Literal["total_ms", "max_ms", "calls"] = "total_ms",
+    current_user: Principal = Depends(require_headteacher_role)
+):
+    """Get slow statement fingerprints ranked by total time, with routes and plans."""
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "fingerprints": slow_query_log.top(limit, order_by),
+    }
+
+
+@router.get("/slow-queries/recent")
+def get_recent_slow_queries(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: Principal = Depends(require_headteacher_role)
+):
+    """Get the most recent slow statements with their bind shapes and routes."""
+    return slow_query_log.recent(limit)
@@ -1,9 +1,22 @@
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from users import router as users_router
+from users_async import router as users_async_router
 from authentication import router as auth_router
 from roles.hr import router as hr_router
 from roles.headteacher import router as headteacher_router
+from roles.headteacher_async import router as headteacher_async_router
+from database import dispose_async_engine
+from internal import router as internal_router
+from hashing import shutdown_hash_executor
+from presence import presence_buffer
+from revocation import revocation_store
+from counters import dashboard_counters
+from query_stats import QueryStatsMiddleware
+
+# Routers to serve through the async database stack, e.g. ASYNC_ROUTERS=users,headteacher
+ASYNC_ROUTERS = {name.strip() for name in os.getenv("ASYNC_ROUTERS", "").split(",") if name.strip()}
 
 app = FastAPI(
     title="School Management System",
@@ -20,11 +33,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request query counts, DB time (Server-Timing) and N+1 warnings
+app.add_middleware(QueryStatsMiddleware)
+
 # Include routers
 app.include_router(auth_router)
-app.include_router(users_router)
+app.include_router(users_async_router if "users" in ASYNC_ROUTERS else users_router)
 app.include_router(hr_router)
-app.include_router(headteacher_router)
+app.include_router(headteacher_async_router if "headteacher" in ASYNC_ROUTERS else headteacher_router)
+app.include_router(internal_router)
+
+
+@app.on_event("startup")
+def startup():
+    presence_buffer.start()
+    revocation_store.start()
+    dashboard_counters.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    presence_buffer.stop()
+    revocation_store.stop()
+    dashboard_counters.stop()
+    shutdown_hash_executor()
+    await dispose_async_engine()
 
 @app.get("/")
 def read_root():
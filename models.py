@@ -1,7 +1,7 @@
 import re
 from typing import Optional, List
 from pydantic import BaseModel, EmailStr, ConfigDict, field_validator
-from sqlalchemy import Column, DateTime, Float, Integer, String, Date, Boolean, ForeignKey, Enum as SQLEnum, Text
+from sqlalchemy import Column, DateTime, Float, Integer, String, Date, Boolean, ForeignKey, Enum as SQLEnum, Text, Index, text
 from sqlalchemy.orm import relationship
 from database import Base
 from enum import Enum as PyEnum
@@ -55,6 +55,11 @@ class AttendanceStatusEnum(str, enum.Enum):
 # ==================== USER MODEL ====================
 class User(Base):
     __tablename__ = "users"
+    # Keyset pagination order, overall and within a role (see pagination.py)
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+        Index("ix_users_role_created_at_id", "role", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -75,8 +80,8 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     is_verified = Column(Boolean, default=False)
     
-    # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Timestamps; created_at is NOT NULL because it keys the keyset pagination order
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=text("CURRENT_TIMESTAMP"), nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_seen_at = Column(DateTime, nullable=True)
     
@@ -122,10 +127,13 @@ class Subject(Base):
 # ==================== CLASS MODEL ====================
 class Class(Base):
     __tablename__ = "classes"
+    __table_args__ = (
+        Index("ix_classes_teacher_year_term", "teacher_id", "academic_year", "term"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)  # e.g., "Form 1A - Mathematics"
-    subject_id = Column(Integer, ForeignKey("subjects.id"), nullable=False)
+    subject_id = Column(Integer, ForeignKey("subjects.id"), nullable=False, index=True)
     teacher_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
     grade_level = Column(Integer, nullable=False)  # Form 1-4
@@ -151,9 +159,12 @@ class Class(Base):
 # ==================== ENROLLMENT MODEL ====================
 class Enrollment(Base):
     __tablename__ = "enrollments"
+    __table_args__ = (
+        Index("ix_enrollments_class_status", "class_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    student_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     class_id = Column(Integer, ForeignKey("classes.id"), nullable=False)
     
     enrollment_date = Column(Date, default=datetime.utcnow)
@@ -170,6 +181,11 @@ class Enrollment(Base):
 # ==================== GRADE MODEL ====================
 class Grade(Base):
     __tablename__ = "grades"
+    __table_args__ = (
+        Index("ix_grades_student_year_term", "student_id", "academic_year", "term"),
+        Index("ix_grades_class_year_term", "class_id", "academic_year", "term"),
+        Index("ix_grades_subject_date", "subject_id", "assessment_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -205,6 +221,10 @@ class Grade(Base):
 # ==================== ATTENDANCE MODEL ====================
 class Attendance(Base):
     __tablename__ = "attendance"
+    __table_args__ = (
+        Index("ix_attendance_class_date", "class_id", "date"),
+        Index("ix_attendance_student_date", "student_id", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -227,8 +247,8 @@ class ParentStudent(Base):
     __tablename__ = "parent_student"
 
     id = Column(Integer, primary_key=True, index=True)
-    parent_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    student_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    parent_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    student_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     
     relationship_type = Column(String, nullable=False)  # "father", "mother", "guardian"
     is_primary_contact = Column(Boolean, default=False)
@@ -266,6 +286,10 @@ class Announcement(Base):
 # ==================== FEE MODEL ====================
 class Fee(Base):
     __tablename__ = "fees"
+    __table_args__ = (
+        Index("ix_fees_student_year_term", "student_id", "academic_year", "term"),
+        Index("ix_fees_year_term_status", "academic_year", "term", "payment_status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -290,16 +314,64 @@ class Payment(Base):
     __tablename__ = "payments"
 
     id = Column(Integer, primary_key=True, index=True)
-    fee_id = Column(Integer, ForeignKey("fees.id"), nullable=False)
+    fee_id = Column(Integer, ForeignKey("fees.id"), nullable=False, index=True)
     
     amount = Column(Float, nullable=False)
     payment_method = Column(String, nullable=False)  # "cash", "bank_transfer", "mobile_money"
     transaction_reference = Column(String, unique=True, nullable=True)
     
     payment_date = Column(Date, nullable=False)
-    received_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    received_by = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     
     remarks = Column(Text, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+# ==================== REVOKED TOKEN MODEL ====================
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String, primary_key=True)  # JWT ID of the revoked refresh token
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    expires_at = Column(DateTime, nullable=False, index=True)  # Row can be pruned after this
+    revoked_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+# ==================== DASHBOARD COUNTER MODEL ====================
+class DashboardCounter(Base):
+    __tablename__ = "dashboard_counters"
+
+    # Users per (role, department, is_active); maintained by counters.py
+    role = Column(String, primary_key=True)  # RoleEnum value
+    department = Column(String, primary_key=True)  # DepartmentEnum value, "" for none
+    is_active = Column(Boolean, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+# ==================== GRADE ROLLUP MODELS ====================
+class GradeMonthlyRollup(Base):
+    __tablename__ = "grade_monthly_rollup"
+
+    # Grades per (month, subject, grade level); maintained by rollups.py
+    month = Column(Date, primary_key=True)  # First day of the month
+    subject_id = Column(Integer, ForeignKey("subjects.id"), primary_key=True)
+    grade_level = Column(Integer, primary_key=True)  # Form 1-4, from the grade's class
+
+    score_sum = Column(Float, nullable=False, default=0.0)  # Sum of percentages
+    score_count = Column(Integer, nullable=False, default=0)
+    pass_count = Column(Integer, nullable=False, default=0)
+    student_count = Column(Integer, nullable=False, default=0)  # Distinct students
+
+
+class GradeMonthlyStudent(Base):
+    __tablename__ = "grade_monthly_students"
+
+    # Students graded in each rollup bucket; backs the distinct student counts
+    month = Column(Date, primary_key=True)
+    subject_id = Column(Integer, ForeignKey("subjects.id"), primary_key=True)
+    grade_level = Column(Integer, primary_key=True)
+    student_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+
+    grade_count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,84 @@
+"""
+Keyset (cursor) pagination for user listings.
+
+Pages are ordered by (created_at, id) and continue from the last row of the
+previous page, so a deep page costs the same index range scan as the first
+one. Cursors are opaque URL-safe tokens; clients only pass them back.
+"""
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, select, tuple_
+
+import models
+
+
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "200"))
+
+
+def encode_cursor(user) -> str:
+    """Cursor pointing just past user (a User or a row with created_at and id)."""
+    raw = json.dumps([user.created_at.isoformat(), user.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Parse a cursor produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, user_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(user_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    """Requested page size bounded by MAX_PAGE_SIZE."""
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def users_page_query(
+    roles: Optional[Iterable[models.RoleEnum]] = None,
+    department: Optional[models.DepartmentEnum] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    columns: Optional[Sequence] = None
+) -> Select:
+    """
+    SELECT for one page of users; fetches one extra row to detect a next page.
+    With columns, selects those (which must include created_at and id) instead of User.
+    """
+    query = select(*columns) if columns else select(models.User)
+
+    if roles is not None:
+        roles = list(roles)
+        if len(roles) == 1:
+            query = query.where(models.User.role == roles[0])
+        else:
+            query = query.where(models.User.role.in_(roles))
+    if department is not None:
+        query = query.where(models.User.department == department)
+    if cursor:
+        query = query.where(
+            tuple_(models.User.created_at, models.User.id) > tuple_(*decode_cursor(cursor))
+        )
+
+    return query.order_by(models.User.created_at, models.User.id).limit(clamp_page_size(limit) + 1)
+
+
+def build_page(rows: Sequence, limit: Optional[int] = None) -> dict:
+    """Split the rows of users_page_query into a page and the next cursor."""
+    page_size = clamp_page_size(limit)
+    items: List = list(rows[:page_size])
+    next_cursor = encode_cursor(items[-1]) if len(rows) > page_size else None
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,59 @@
+"""
+Background helper for in-process jobs that run every N seconds.
+"""
+import logging
+import threading
+from typing import Callable, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Run a callable on a daemon thread every interval seconds."""
+
+    def __init__(self, name: str, interval: float, fn: Callable[[], None]):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the thread if it is not already running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def trigger(self) -> None:
+        """Run the job as soon as possible instead of waiting for the interval."""
+        self._wakeup.set()
+
+    def stop(self, run_final: bool = True) -> None:
+        """Stop the thread, optionally running the job one last time."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if run_final:
+            self._run_once()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            self._run_once()
+
+    def _run_once(self) -> None:
+        try:
+            self.fn()
+        except Exception:
+            logger.exception("Periodic task %s failed", self.name)
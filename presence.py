@@ -0,0 +1,168 @@
+"""
+Presence buffer - write-behind batching for users.last_seen_at.
+
+Authenticated requests record a timestamp in memory; a background task
+flushes the newest timestamp per user in one batched UPDATE every
+PRESENCE_FLUSH_SECONDS, or sooner once PRESENCE_MAX_ENTRIES users are pending.
+After a failed flush the entries are kept for retry, flushes back off
+exponentially up to PRESENCE_MAX_BACKOFF_SECONDS, and at most
+PRESENCE_MAX_PENDING users are held (the least recently seen are dropped).
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import bindparam, or_, text, update
+
+from database import engine
+from models import User
+from periodic import PeriodicTask
+
+
+logger = logging.getLogger(__name__)
+
+PRESENCE_FLUSH_SECONDS = float(os.getenv("PRESENCE_FLUSH_SECONDS", "10"))
+PRESENCE_MAX_ENTRIES = int(os.getenv("PRESENCE_MAX_ENTRIES", "500"))
+PRESENCE_MAX_PENDING = int(os.getenv("PRESENCE_MAX_PENDING", "50000"))
+PRESENCE_MAX_BACKOFF_SECONDS = float(os.getenv("PRESENCE_MAX_BACKOFF_SECONDS", "300"))
+PRESENCE_BATCH_SIZE = 1000
+
+
+class PresenceBuffer:
+    """Collects last-seen timestamps and flushes them in batches."""
+
+    def __init__(
+        self,
+        flush_interval: float = PRESENCE_FLUSH_SECONDS,
+        max_entries: int = PRESENCE_MAX_ENTRIES,
+        max_pending: int = PRESENCE_MAX_PENDING,
+        max_backoff: float = PRESENCE_MAX_BACKOFF_SECONDS
+    ):
+        self.flush_interval = flush_interval
+        self.max_entries = max_entries
+        self.max_pending = max_pending
+        self.max_backoff = max_backoff
+        # Insertion order is recency order, so the first key is the least recently seen
+        self._pending: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._retry_at = 0.0
+        self.dropped = 0
+        self._task = PeriodicTask("presence-flush", flush_interval, self.flush)
+
+    def _trim(self) -> None:
+        """Drop the least recently seen users beyond max_pending; call with the lock held."""
+        while len(self._pending) > self.max_pending:
+            del self._pending[next(iter(self._pending))]
+            self.dropped += 1
+
+    def _backing_off(self) -> bool:
+        return time.monotonic() < self._retry_at
+
+    def touch(self, user_id: int, seen_at: Optional[datetime] = None) -> None:
+        """Record that a user was seen; the write happens on the next flush."""
+        seen_at = seen_at or datetime.utcnow()
+        with self._lock:
+            previous = self._pending.pop(user_id, None)
+            self._pending[user_id] = seen_at if previous is None or previous < seen_at else previous
+            self._trim()
+            pending = len(self._pending)
+            backing_off = self._backing_off()
+
+        if pending >= self.max_entries and not backing_off:
+            self._task.trigger()
+
+    def flush(self, force: bool = False) -> int:
+        """
+        Write all pending timestamps; returns the number of users updated.
+        Skipped while backing off from a failed flush, unless force is set.
+        """
+        with self._lock:
+            if self._backing_off() and not force:
+                return 0
+            entries, self._pending = self._pending, {}
+
+        if not entries:
+            return 0
+
+        try:
+            items = list(entries.items())
+            with engine.begin() as conn:
+                for start in range(0, len(items), PRESENCE_BATCH_SIZE):
+                    self._write_batch(conn, items[start:start + PRESENCE_BATCH_SIZE])
+        except Exception:
+            with self._lock:
+                # Put the entries back, older than anything touched since, keeping the newer timestamp
+                for user_id, seen_at in self._pending.items():
+                    if entries.get(user_id, seen_at) <= seen_at:
+                        entries.pop(user_id, None)
+                        entries[user_id] = seen_at
+                self._pending = entries
+                self._trim()
+                self._failures += 1
+                backoff = min(self.flush_interval * 2 ** (self._failures - 1), self.max_backoff)
+                self._retry_at = time.monotonic() + backoff
+            logger.exception(
+                "Failed to flush %d last-seen timestamps; retrying in %.0fs", len(entries), backoff
+            )
+            return 0
+
+        with self._lock:
+            self._failures = 0
+            self._retry_at = 0.0
+        return len(entries)
+
+    def _write_batch(self, conn, items) -> None:
+        if conn.dialect.name == "postgresql":
+            values = ", ".join(
+                f"(:id{i}, CAST(:ts{i} AS TIMESTAMP))" for i in range(len(items))
+            )
+            params = {}
+            for i, (user_id, seen_at) in enumerate(items):
+                params[f"id{i}"] = user_id
+                params[f"ts{i}"] = seen_at
+            conn.execute(
+                text(
+                    f"UPDATE users SET last_seen_at = v.ts "
+                    f"FROM (VALUES {values}) AS v(id, ts) "
+                    f"WHERE users.id = v.id "
+                    f"AND (users.last_seen_at IS NULL OR users.last_seen_at < v.ts)"
+                ),
+                params
+            )
+        else:
+            # Dialects without UPDATE ... FROM (VALUES) get a single executemany
+            users = User.__table__
+            conn.execute(
+                update(users)
+                .where(
+                    users.c.id == bindparam("user_id"),
+                    or_(users.c.last_seen_at.is_(None), users.c.last_seen_at < bindparam("seen_at")),
+                )
+                .values(last_seen_at=bindparam("seen_at"), updated_at=users.c.updated_at),
+                [{"user_id": user_id, "seen_at": seen_at} for user_id, seen_at in items]
+            )
+
+    def start(self) -> None:
+        self._task.start()
+
+    def stop(self) -> None:
+        """Stop the background task and flush whatever is still pending."""
+        self._task.stop(run_final=False)
+        self.flush(force=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "max_entries": self.max_entries,
+                "max_pending": self.max_pending,
+                "dropped": self.dropped,
+                "consecutive_failures": self._failures,
+            }
+
+
+presence_buffer = PresenceBuffer()
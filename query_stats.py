@@ -0,0 +1,160 @@
+"""
+Per-request SQL instrumentation.
+
+Engine-wide cursor events count statements and DB time for the request
+currently being served (tracked in a context variable). QueryStatsMiddleware
+reports the totals in a Server-Timing header and flags statements repeated
+more than N_PLUS_ONE_THRESHOLD times in one request as suspected N+1 loops.
+count_queries / assert_max_queries give tests the same numbers.
+"""
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+
+logger = logging.getLogger(__name__)
+
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+
+class QueryStats:
+    """Statement count, DB time and statement shapes for one unit of work."""
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.scope = scope
+        self.count = 0
+        self.total_time = 0.0
+        self.statements: Counter = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def route(self) -> Optional[str]:
+        """Route template (e.g. /hr/user/{user_id}), falling back to the raw path."""
+        if self.scope is None:
+            return None
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.scope.get("path")
+
+    def record(self, statement: str, elapsed: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_time += elapsed
+            self.statements[statement] += 1
+
+    def suspected_n_plus_one(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> List[Tuple[str, int]]:
+        """Statement shapes executed more than threshold times."""
+        with self._lock:
+            return [(sql, n) for sql, n in self.statements.most_common() if n > threshold]
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+# Collectors opened by count_queries; they see statements from every thread
+_collectors: List[QueryStats] = []
+_collectors_lock = threading.Lock()
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Stats for the request being served in this context, if any."""
+    return _current.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started_at = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_at = getattr(context, "_query_started_at", None)
+    if started_at is None:
+        return
+    elapsed = time.perf_counter() - started_at
+
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if _collectors:
+        with _collectors_lock:
+            for collector in _collectors:
+                collector.record(statement, elapsed)
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware adding Server-Timing and N+1 warnings to each response."""
+
+    def __init__(self, app, n_plus_one_threshold: int = N_PLUS_ONE_THRESHOLD):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope)
+        token = _current.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.total_time * 1000:.1f};desc="{stats.count} queries"'
+                )
+                suspects = stats.suspected_n_plus_one(self.n_plus_one_threshold)
+                if suspects:
+                    headers.append("X-Suspected-N-Plus-One", str(len(suspects)))
+                    for statement, repeats in suspects:
+                        logger.warning(
+                            "Suspected N+1 on %s %s: statement ran %d times: %s",
+                            scope["method"], stats.route, repeats, " ".join(statement.split())[:200]
+                        )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """
+    Count every statement executed while the block runs, on any thread.
+
+    Meant for tests: wrap a single request (e.g. a TestClient call) and
+    inspect stats.count or stats.statements afterwards.
+    """
+    stats = QueryStats()
+    with _collectors_lock:
+        _collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        with _collectors_lock:
+            _collectors.remove(stats)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[QueryStats]:
+    """Fail with the executed statements if the block issues more than max_queries."""
+    with count_queries() as stats:
+        yield stats
+
+    if stats.count > max_queries:
+        listing = "\n".join(
+            f"  {n}x {' '.join(sql.split())[:200]}" for sql, n in stats.statements.most_common()
+        )
+        raise AssertionError(
+            f"Expected at most {max_queries} queries, got {stats.count}:\n{listing}"
+        )
@@ -0,0 +1,174 @@
+"""
+Sliding-window rate limiting for login attempts.
+
+Each key keeps two fixed-window counters (current and previous); the
+sliding estimate weights the previous window by how much of it still
+overlaps the sliding window. That is three numbers per key, so large
+credential-stuffing bursts stay cheap to track. Backends are pluggable so
+the counters can be shared between workers.
+
+Every attempt counts against the client IP. Only failed attempts count
+against the email, and a successful login clears them, so normal use never
+trips the per-email limit.
+"""
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from fastapi import HTTPException, status
+
+
+LOGIN_RATE_WINDOW_SECONDS = float(os.getenv("LOGIN_RATE_WINDOW_SECONDS", "60"))
+LOGIN_RATE_PER_EMAIL = int(os.getenv("LOGIN_RATE_PER_EMAIL", "5"))
+LOGIN_RATE_PER_IP = int(os.getenv("LOGIN_RATE_PER_IP", "30"))
+LOGIN_RATE_MAX_KEYS = int(os.getenv("LOGIN_RATE_MAX_KEYS", "100000"))
+
+
+class RateLimitBackend(ABC):
+    """Storage for sliding-window counters."""
+
+    @abstractmethod
+    def hit(self, key: str, window: float, now: float) -> float:
+        """Record a hit and return the sliding-window count including it."""
+
+    @abstractmethod
+    def count(self, key: str, window: float, now: float) -> float:
+        """The sliding-window count, without recording a hit."""
+
+    @abstractmethod
+    def reset(self, key: str) -> None:
+        """Forget a key's hits."""
+
+    def __len__(self) -> int:
+        return 0
+
+
+class InMemoryBackend(RateLimitBackend):
+    """Per-process counters with LRU eviction beyond max_keys."""
+
+    def __init__(self, max_keys: int = LOGIN_RATE_MAX_KEYS):
+        self.max_keys = max_keys
+        # key -> [window index, current count, previous count]
+        self._counters: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _roll(counter: list, index: int) -> None:
+        if counter[0] != index:
+            # Roll the windows forward; anything older than one window is dropped
+            counter[2] = counter[1] if counter[0] == index - 1 else 0
+            counter[1] = 0
+            counter[0] = index
+
+    @staticmethod
+    def _estimate(counter: list, window: float, now: float) -> float:
+        overlap = 1.0 - (now % window) / window
+        return counter[2] * overlap + counter[1]
+
+    def hit(self, key: str, window: float, now: float) -> float:
+        index = int(now // window)
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                counter = [index, 0, 0]
+                self._counters[key] = counter
+                while len(self._counters) > self.max_keys:
+                    self._counters.popitem(last=False)
+            else:
+                self._counters.move_to_end(key)
+
+            self._roll(counter, index)
+            counter[1] += 1
+            return self._estimate(counter, window, now)
+
+    def count(self, key: str, window: float, now: float) -> float:
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                return 0.0
+            self._roll(counter, int(now // window))
+            return self._estimate(counter, window, now)
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._counters.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+
+class LoginRateLimiter:
+    """Throttles login attempts by email and by client IP."""
+
+    def __init__(
+        self,
+        backend: Optional[RateLimitBackend] = None,
+        window: float = LOGIN_RATE_WINDOW_SECONDS,
+        per_email: int = LOGIN_RATE_PER_EMAIL,
+        per_ip: int = LOGIN_RATE_PER_IP
+    ):
+        self.backend = backend or InMemoryBackend()
+        self.window = window
+        self.per_email = per_email
+        self.per_ip = per_ip
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected_email = 0
+        self.rejected_ip = 0
+
+    @staticmethod
+    def _email_key(email: str) -> str:
+        return f"email:{email.lower()}"
+
+    def check(self, email: str, client_ip: Optional[str]) -> None:
+        """Count an attempt against the IP, raising 429 if the IP or the email's failures are over the limit."""
+        now = time.time()
+
+        if client_ip and self.backend.hit(f"ip:{client_ip}", self.window, now) > self.per_ip:
+            self._reject("rejected_ip")
+
+        if self.backend.count(self._email_key(email), self.window, now) >= self.per_email:
+            self._reject("rejected_email")
+
+        with self._lock:
+            self.allowed += 1
+
+    def record_failure(self, email: str) -> None:
+        """Count a failed login against the email."""
+        self.backend.hit(self._email_key(email), self.window, time.time())
+
+    def record_success(self, email: str) -> None:
+        """Clear the email's failed attempts after a successful login."""
+        self.backend.reset(self._email_key(email))
+
+    def _reject(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, please try again later",
+            headers={"Retry-After": str(int(self.window))},
+        )
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "window_seconds": self.window,
+                "limit_per_email": self.per_email,
+                "limit_per_ip": self.per_ip,
+                "allowed": self.allowed,
+                "rejected_email": self.rejected_email,
+                "rejected_ip": self.rejected_ip,
+                "tracked_keys": len(self.backend),
+            }
+
+
+login_rate_limiter = LoginRateLimiter()
+
+
+def set_rate_limit_backend(backend: RateLimitBackend) -> None:
+    """Swap the counter storage, e.g. for a backend shared between workers."""
+    login_rate_limiter.backend = backend
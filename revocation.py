@@ -0,0 +1,168 @@
+"""
+Refresh-token revocation index.
+
+Revoked token ids (jti) live in the revoked_tokens table. Each worker keeps
+a Bloom filter of them in memory, so the common "not revoked" check costs
+O(1) and no query; only Bloom hits are confirmed against the table. A
+background sync pulls revocations made by other workers every
+REVOCATION_SYNC_SECONDS, which bounds how long a revocation takes to apply
+everywhere, and expired rows are pruned every REVOCATION_PRUNE_SECONDS.
+"""
+import hashlib
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import RevokedToken
+from periodic import PeriodicTask
+
+
+REVOCATION_CAPACITY = int(os.getenv("REVOCATION_CAPACITY", "100000"))
+REVOCATION_ERROR_RATE = float(os.getenv("REVOCATION_ERROR_RATE", "0.001"))
+REVOCATION_SYNC_SECONDS = float(os.getenv("REVOCATION_SYNC_SECONDS", "5"))
+REVOCATION_PRUNE_SECONDS = float(os.getenv("REVOCATION_PRUNE_SECONDS", "3600"))
+# Re-read a little history on every sync to absorb clock skew between workers
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RevocationStore:
+    """Bloom filter in front of the revoked_tokens table."""
+
+    def __init__(
+        self,
+        capacity: int = REVOCATION_CAPACITY,
+        error_rate: float = REVOCATION_ERROR_RATE,
+        sync_interval: float = REVOCATION_SYNC_SECONDS,
+        prune_interval: float = REVOCATION_PRUNE_SECONDS
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.prune_interval = prune_interval
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._lock = threading.Lock()
+        self._synced_until: Optional[datetime] = None
+        self._last_prune = time.monotonic()
+        self._task = PeriodicTask("revocation-sync", sync_interval, self.sync)
+        self.bloom_hits = 0
+        self.false_positives = 0
+
+    def is_revoked(self, db: Session, jti: str) -> bool:
+        """Check a token id; only Bloom filter hits touch the database."""
+        if jti not in self._bloom:
+            return False
+
+        self.bloom_hits += 1
+        revoked = db.query(RevokedToken.jti).filter(RevokedToken.jti == jti).first() is not None
+        if not revoked:
+            self.false_positives += 1
+        return revoked
+
+    def revoke(self, db: Session, jti: str, expires_at: datetime, user_id: Optional[int] = None) -> bool:
+        """
+        Revoke a token id.
+
+        Returns False if it was already revoked, which makes the insert the
+        single point that decides whether a refresh token may be used.
+        """
+        db.add(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            return False
+
+        self._bloom.add(jti)
+        return True
+
+    def sync(self) -> None:
+        """Load revocations made by other workers and prune expired rows."""
+        db = SessionLocal()
+        try:
+            if time.monotonic() - self._last_prune >= self.prune_interval:
+                self._prune(db)
+            elif self._synced_until is None:
+                self._rebuild(db)
+            else:
+                self._load_since(db, self._synced_until - SYNC_OVERLAP)
+        finally:
+            db.close()
+
+    def _load_since(self, db: Session, since: datetime) -> None:
+        started_at = datetime.utcnow()
+        rows = db.query(RevokedToken.jti).filter(RevokedToken.revoked_at >= since).all()
+        with self._lock:
+            for (jti,) in rows:
+                self._bloom.add(jti)
+            self._synced_until = started_at
+
+    def _rebuild(self, db: Session) -> None:
+        # Bloom filters cannot forget entries, so rebuilding is how pruned
+        # rows leave the filter; it also grows the filter when it fills up
+        started_at = datetime.utcnow()
+        rows = db.query(RevokedToken.jti).filter(RevokedToken.expires_at > started_at).all()
+        bloom = BloomFilter(max(self.capacity, len(rows) * 2), self.error_rate)
+        for (jti,) in rows:
+            bloom.add(jti)
+        with self._lock:
+            self._bloom = bloom
+            self._synced_until = started_at
+
+    def _prune(self, db: Session) -> None:
+        db.query(RevokedToken).filter(
+            RevokedToken.expires_at <= datetime.utcnow()
+        ).delete(synchronize_session=False)
+        db.commit()
+        self._last_prune = time.monotonic()
+        self._rebuild(db)
+
+    def start(self) -> None:
+        """Start background syncing, loading the current revocations right away."""
+        self._task.start()
+        self._task.trigger()
+
+    def stop(self) -> None:
+        self._task.stop(run_final=False)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "entries": self._bloom.count,
+            "bloom_capacity": self._bloom.capacity,
+            "bloom_hits": self.bloom_hits,
+            "false_positives": self.false_positives,
+        }
+
+
+revocation_store = RevocationStore()
@@ -2,11 +2,13 @@
 Headteacher Routes - Dashboard and management endpoints
 Only accessible by users with Headteacher role
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from authentication import get_current_user
-from database import get_db
+from security import Principal
+from database import get_read_db
 import schemas
 import models
 from services import dashboard_service
@@ -19,7 +21,7 @@ router = APIRouter(
 )
 
 
-def require_headteacher_role(current_user: models.User = Depends(get_current_user)):
+def require_headteacher_role(current_user: Principal = Depends(get_current_user)):
     """Dependency to check if user is a headteacher."""
     if current_user.role != schemas.Roles.HEADMASTER:
         raise HTTPException(
@@ -34,8 +36,8 @@ def require_headteacher_role(current_user: models.User = Depends(get_current_use
 
 @router.get("/dashboard", response_model=schemas.HeadteacherDashboard)
 def get_dashboard(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_headteacher_role)
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require_headteacher_role)
 ):
     """
     Get complete dashboard data for headteacher including:
@@ -50,8 +52,8 @@ def get_dashboard(
 
 @router.get("/stats", response_model=schemas.DashboardStats)
 def get_stats(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_headteacher_role)
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require_headteacher_role)
 ):
     """Get overall statistics."""
     return dashboard_service.get_dashboard_stats(db)
@@ -59,8 +61,8 @@ def get_stats(
 
 @router.get("/departments", response_model=List[schemas.DepartmentInfo])
 def get_departments(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_headteacher_role)
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require_headteacher_role)
 ):
     """Get detailed information about all departments."""
     return dashboard_service.get_department_info(db)
@@ -68,9 +70,9 @@ def get_departments(
 
 @router.get("/performance-trends", response_model=List[schemas.PerformanceTrend])
 def get_performance_trends(
-    months: int = 6,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_headteacher_role)
+    months: int = Query(6, ge=1, le=dashboard_service.MAX_TREND_MONTHS),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require_headteacher_role)
 ):
     """Get performance trends for the specified number of months."""
     return dashboard_service.get_performance_trends(db, months)
@@ -78,31 +80,36 @@ def get_performance_trends(
 
 @router.get("/teachers", response_model=List[schemas.TeacherStats])
 def get_teachers_stats(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_headteacher_role)
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=dashboard_service.MAX_TEACHER_PAGE_SIZE),
+    academic_year: Optional[str] = None,
+    term: Optional[schemas.Term] = None,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require_headteacher_role)
 ):
-    """Get statistics for all teachers."""
-    return dashboard_service.get_teacher_statistics(db, skip, limit)
+    """Get statistics for a page of teachers, optionally for one academic year and term."""
+    return dashboard_service.get_teacher_statistics(db, skip, limit, academic_year, term)
 
 
 @router.get("/students", response_model=List[schemas.StudentStats])
 def get_students_stats(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_headteacher_role)
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=dashboard_service.MAX_STUDENT_PAGE_SIZE),
+    academic_year: Optional[str] = None,
+    term: Optional[schemas.Term] = None,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require_headteacher_role)
 ):
-    """Get statistics for all students."""
-    return dashboard_service.get_student_statistics(db, skip, limit)
+    """Get statistics for a page of students, optionally for one academic year and term."""
+    # Fast path: plain dicts straight to orjson, no per-item Pydantic validation
+    return ORJSONResponse(dashboard_service.get_student_statistics(db, skip, limit, academic_year, term))
 
 
 @router.get("/recent-registrations")
 def get_recent_registrations(
     days: int = 30,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_headteacher_role)
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require_headteacher_role)
 ):
     """Get number of students registered in the last N days."""
     count = dashboard_service.get_recent_registrations(db, days)
@@ -115,8 +122,8 @@ def get_recent_registrations(
 
 @router.get("/teacher-student-ratio")
 def get_ratio(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_headteacher_role)
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require_headteacher_role)
 ):
     """Get teacher to student ratio."""
     ratio = dashboard_service.calculate_teacher_student_ratio(db)
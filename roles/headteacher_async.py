@@ -0,0 +1,120 @@
+"""
+Headteacher Routes served through the async database stack.
+Enabled instead of roles/headteacher.py when "headteacher" is listed in ASYNC_ROUTERS.
+"""
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from database import get_async_db
+from roles.headteacher import require_headteacher_role
+from security import Principal
+import schemas
+from services import async_dashboard_service
+from services.dashboard_service import MAX_STUDENT_PAGE_SIZE, MAX_TEACHER_PAGE_SIZE, MAX_TREND_MONTHS
+
+
+
+router = APIRouter(
+    prefix="/headteacher",
+    tags=["Headteacher Dashboard"]
+)
+
+
+@router.get("/dashboard", response_model=schemas.HeadteacherDashboard)
+async def get_dashboard(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_headteacher_role)
+):
+    """
+    Get complete dashboard data for headteacher including:
+    - Total students, teachers, departments
+    - Department information with HODs
+    - Performance trends
+    - Recent registrations
+    - Teacher-student ratio
+    """
+    return await async_dashboard_service.get_headteacher_dashboard(db)
+
+
+@router.get("/stats", response_model=schemas.DashboardStats)
+async def get_stats(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_headteacher_role)
+):
+    """Get overall statistics."""
+    return await async_dashboard_service.get_dashboard_stats(db)
+
+
+@router.get("/departments", response_model=List[schemas.DepartmentInfo])
+async def get_departments(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_headteacher_role)
+):
+    """Get detailed information about all departments."""
+    return await async_dashboard_service.get_department_info(db)
+
+
+@router.get("/performance-trends", response_model=List[schemas.PerformanceTrend])
+async def get_performance_trends(
+    months: int = Query(6, ge=1, le=MAX_TREND_MONTHS),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_headteacher_role)
+):
+    """Get performance trends for the specified number of months."""
+    return await async_dashboard_service.get_performance_trends(db, months)
+
+
+@router.get("/teachers", response_model=List[schemas.TeacherStats])
+async def get_teachers_stats(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_TEACHER_PAGE_SIZE),
+    academic_year: Optional[str] = None,
+    term: Optional[schemas.Term] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_headteacher_role)
+):
+    """Get statistics for a page of teachers, optionally for one academic year and term."""
+    return await async_dashboard_service.get_teacher_statistics(db, skip, limit, academic_year, term)
+
+
+@router.get("/students", response_model=List[schemas.StudentStats])
+async def get_students_stats(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_STUDENT_PAGE_SIZE),
+    academic_year: Optional[str] = None,
+    term: Optional[schemas.Term] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_headteacher_role)
+):
+    """Get statistics for a page of students, optionally for one academic year and term."""
+    # Fast path: plain dicts straight to orjson, no per-item Pydantic validation
+    return ORJSONResponse(await async_dashboard_service.get_student_statistics(db, skip, limit, academic_year, term))
+
+
+@router.get("/recent-registrations")
+async def get_recent_registrations(
+    days: int = 30,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_headteacher_role)
+):
+    """Get number of students registered in the last N days."""
+    count = await async_dashboard_service.get_recent_registrations(db, days)
+    return {
+        "days": days,
+        "total_registrations": count,
+        "message": f"{count} students registered in the last {days} days"
+    }
+
+
+@router.get("/teacher-student-ratio")
+async def get_ratio(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_headteacher_role)
+):
+    """Get teacher to student ratio."""
+    ratio = await async_dashboard_service.calculate_teacher_student_ratio(db)
+    return {
+        "ratio": ratio,
+        "message": f"Current teacher-student ratio is {ratio}"
+    }
\ No newline at end of file
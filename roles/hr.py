@@ -2,14 +2,17 @@
 HR Routes - Human Resources management endpoints
 Only accessible by users with HR/Manager roles
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Literal, Optional
 from authentication import get_current_user
-from database import get_db
+from security import Principal
+from database import get_db, get_read_db
+from fieldsets import parse_fields, render_user_page
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 import schemas
-import models
-from services import user_service
+from services import export_service, user_service
 
 
 
@@ -19,7 +22,7 @@ router = APIRouter(
 )
 
 
-def require_hr_role(current_user: models.User = Depends(get_current_user)):
+def require_hr_role(current_user: Principal = Depends(get_current_user)):
     """Dependency to check if user has HR privileges."""
     allowed_roles = [schemas.Roles.HEADMASTER, schemas.Roles.MANAGER]
     
@@ -35,7 +38,7 @@ def require_hr_role(current_user: models.User = Depends(get_current_user)):
 def create_teacher(
     teacher_data: schemas.CreateUser,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_hr_role)
+    current_user: Principal = Depends(require_hr_role)
 ):
     """
     Create a new teacher account.
@@ -58,7 +61,7 @@ def create_teacher(
 def create_staff(
     staff_data: schemas.CreateUser,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_hr_role)
+    current_user: Principal = Depends(require_hr_role)
 ):
     """
     Create a new staff member (Librarian, Bursar, etc.).
@@ -82,39 +85,72 @@ def create_staff(
     return new_staff
 
 
-@router.get("/teachers", response_model=List[schemas.UserResponse])
+@router.get("/teachers", response_model=schemas.UserPage)
 def get_all_teachers(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_hr_role)
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    department: Optional[schemas.Departments] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated UserResponse fields to return"),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require_hr_role)
 ):
-    """Get all teachers."""
-    return user_service.get_users_by_role(db, schemas.Roles.TEACHER, skip, limit)
+    """Get teachers one page at a time."""
+    fieldset = parse_fields(fields)
+    page = user_service.get_users_by_role(db, schemas.Roles.TEACHER, cursor, limit, department, fieldset)
+    return render_user_page(page, fieldset)
 
 
-@router.get("/staff", response_model=List[schemas.UserResponse])
+@router.get("/staff", response_model=schemas.UserPage)
 def get_all_staff(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_hr_role)
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    role: Optional[schemas.Roles] = None,
+    department: Optional[schemas.Departments] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated UserResponse fields to return"),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require_hr_role)
 ):
-    """Get all staff members."""
+    """Get staff members one page at a time, optionally narrowed to one staff role."""
     staff_roles = [schemas.Roles.LIBRARIAN, schemas.Roles.BURSER, schemas.Roles.TEACHER]
     
-    staff = db.query(models.User).filter(
-        models.User.role.in_(staff_roles)
-    ).offset(skip).limit(limit).all()
+    if role is not None:
+        if role not in staff_roles:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid staff role. Allowed roles: {', '.join([r.value for r in staff_roles])}"
+            )
+        staff_roles = [role]
     
-    return staff
+    # Fast path: row tuples straight to orjson, no per-item Pydantic validation
+    page = user_service.list_user_rows(db, staff_roles, department, cursor, limit, parse_fields(fields))
+    return ORJSONResponse(page)
+
+
+@router.get("/export/users")
+def export_users(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = False,
+    role: Optional[schemas.Roles] = None,
+    department: Optional[schemas.Departments] = None,
+    current_user: Principal = Depends(require_hr_role)
+):
+    """
+    Stream the user directory as NDJSON or CSV, optionally gzipped.
+    Memory use is constant regardless of the number of users.
+    """
+    filename = f"users.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        export_service.export_users(format, gzip, role, department),
+        media_type="application/gzip" if gzip else export_service.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 
 @router.patch("/deactivate/{user_id}")
 def deactivate_user(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_hr_role)
+    current_user: Principal = Depends(require_hr_role)
 ):
     """Deactivate a user account."""
     user = user_service.deactivate_user(db, user_id)
@@ -125,7 +161,7 @@ def deactivate_user(
 def activate_user(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_hr_role)
+    current_user: Principal = Depends(require_hr_role)
 ):
     """Activate a user account."""
     user = user_service.activate_user(db, user_id)
@@ -136,7 +172,7 @@ def activate_user(
 def get_user_details(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_hr_role)
+    current_user: Principal = Depends(require_hr_role)
 ):
     """Get detailed information about a specific user."""
     user = user_service.get_user_by_id(db, user_id)
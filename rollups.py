@@ -0,0 +1,189 @@
+"""
+Monthly grade rollup.
+
+grade_monthly_rollup keeps, per (month, subject, grade level), the sum and
+count of grade percentages, the number of passes and the number of distinct
+students; grade_monthly_students records which students are in each bucket
+so distinct counts can be maintained. ORM events on Grade apply each write
+incrementally in the same transaction. rebuild_grade_rollup() recomputes
+both tables from grades in bulk (after bulk loads, or a PASS_MARK change).
+"""
+import logging
+import os
+from datetime import date
+from typing import Optional, Tuple
+
+from sqlalchemy import Date, case, cast, delete, event, func, inspect, insert, select, text
+
+from counters import increment_row
+from database import engine
+from models import Class, Grade, GradeMonthlyRollup, GradeMonthlyStudent
+
+
+logger = logging.getLogger(__name__)
+
+PASS_MARK = float(os.getenv("PASS_MARK", "50"))
+
+RollupKey = Tuple[date, int, int]
+
+
+def grade_percent(score: float, max_score: Optional[float], percentage: Optional[float]) -> float:
+    """The grade as a percentage: the stored percentage, else score over max_score."""
+    if percentage is not None:
+        return percentage
+    return score * 100.0 / (max_score or 100.0)
+
+
+def percent_expr():
+    """grade_percent() as a SQL expression over Grade."""
+    return func.coalesce(
+        Grade.percentage,
+        Grade.score * 100.0 / func.coalesce(func.nullif(Grade.max_score, 0), 100.0)
+    )
+
+
+def _month_expr(dialect_name: str):
+    """First day of the assessment month, in SQL."""
+    if dialect_name == "sqlite":
+        return func.date(Grade.assessment_date, "start of month")
+    return cast(func.date_trunc("month", Grade.assessment_date), Date)
+
+
+def _apply(connection, key: RollupKey, student_id: int, percent: float, sign: int) -> None:
+    """Add (sign=1) or remove (sign=-1) one grade's contribution."""
+    month, subject_id, grade_level = key
+    bucket = {"month": month, "subject_id": subject_id, "grade_level": grade_level}
+    members = GradeMonthlyStudent.__table__
+
+    membership = {**bucket, "student_id": student_id}
+    increment_row(connection, members, membership, {"grade_count": sign})
+    grade_count = connection.execute(
+        select(members.c.grade_count).where(*(members.c[name] == value for name, value in membership.items()))
+    ).scalar()
+
+    student_delta = 0
+    if sign > 0 and grade_count == 1:
+        student_delta = 1
+    elif sign < 0 and (grade_count or 0) <= 0:
+        connection.execute(
+            delete(members).where(*(members.c[name] == value for name, value in membership.items()))
+        )
+        student_delta = -1
+
+    rollup = GradeMonthlyRollup.__table__
+    increment_row(connection, rollup, bucket, {
+        "score_sum": sign * percent,
+        "score_count": sign,
+        "pass_count": sign if percent >= PASS_MARK else 0,
+        "student_count": student_delta,
+    })
+    if sign < 0:
+        in_bucket = [rollup.c[name] == value for name, value in bucket.items()]
+        # An emptied bucket is dropped, as rebuild_grade_rollup() would not produce it
+        connection.execute(delete(rollup).where(*in_bucket, rollup.c.score_count <= 0))
+
+
+def _contribution(connection, values) -> Tuple[RollupKey, int, float]:
+    """(bucket, student_id, percent) for a grade's column values."""
+    grade_level = connection.execute(
+        select(Class.grade_level).where(Class.id == values["class_id"])
+    ).scalar()
+    key = (values["assessment_date"].replace(day=1), values["subject_id"], grade_level)
+    percent = grade_percent(values["score"], values["max_score"], values["percentage"])
+    return key, values["student_id"], percent
+
+
+_TRACKED = ("student_id", "class_id", "subject_id", "score", "max_score", "percentage", "assessment_date")
+
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+for _name in _TRACKED:
+    # Load expired values before assignment so after_update can subtract them
+    event.listen(getattr(Grade, _name), "set", _keep_old_value, active_history=True)
+
+
+def _current_values(target: Grade) -> dict:
+    return {name: getattr(target, name) for name in _TRACKED}
+
+
+def _previous_values(target: Grade) -> Optional[dict]:
+    """Values before this flush, or None if no tracked column changed."""
+    state = inspect(target)
+    changed = False
+    values = {}
+    for name in _TRACKED:
+        history = state.attrs[name].history
+        if history.deleted:
+            changed = True
+            values[name] = history.deleted[0]
+        else:
+            values[name] = getattr(target, name)
+    return values if changed else None
+
+
+@event.listens_for(Grade, "after_insert")
+def _grade_inserted(mapper, connection, target):
+    _apply(connection, *_contribution(connection, _current_values(target)), 1)
+
+
+@event.listens_for(Grade, "after_update")
+def _grade_updated(mapper, connection, target):
+    previous = _previous_values(target)
+    if previous is None:
+        return
+    _apply(connection, *_contribution(connection, previous), -1)
+    _apply(connection, *_contribution(connection, _current_values(target)), 1)
+
+
+@event.listens_for(Grade, "after_delete")
+def _grade_deleted(mapper, connection, target):
+    _apply(connection, *_contribution(connection, _current_values(target)), -1)
+
+
+def rebuild_grade_rollup() -> int:
+    """Recompute the rollup tables from grades; returns the number of buckets."""
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Block incremental updates until the rebuilt rows are in place
+            conn.execute(text("LOCK TABLE grade_monthly_rollup, grade_monthly_students IN EXCLUSIVE MODE"))
+
+        month = _month_expr(conn.dialect.name).label("month")
+        percent = percent_expr()
+        graded = select(
+            month,
+            Grade.subject_id,
+            Class.grade_level,
+            Grade.student_id,
+            percent.label("percent"),
+        ).join(Class, Class.id == Grade.class_id).subquery()
+
+        members = GradeMonthlyStudent.__table__
+        rollup = GradeMonthlyRollup.__table__
+        conn.execute(delete(members))
+        conn.execute(delete(rollup))
+
+        conn.execute(insert(members).from_select(
+            ["month", "subject_id", "grade_level", "student_id", "grade_count"],
+            select(
+                graded.c.month, graded.c.subject_id, graded.c.grade_level, graded.c.student_id, func.count()
+            ).group_by(graded.c.month, graded.c.subject_id, graded.c.grade_level, graded.c.student_id)
+        ))
+        conn.execute(insert(rollup).from_select(
+            ["month", "subject_id", "grade_level", "score_sum", "score_count", "pass_count", "student_count"],
+            select(
+                graded.c.month,
+                graded.c.subject_id,
+                graded.c.grade_level,
+                func.sum(graded.c.percent),
+                func.count(),
+                func.sum(case((graded.c.percent >= PASS_MARK, 1), else_=0)),
+                func.count(graded.c.student_id.distinct()),
+            ).group_by(graded.c.month, graded.c.subject_id, graded.c.grade_level)
+        ))
+        buckets = conn.execute(select(func.count()).select_from(rollup)).scalar()
+
+    logger.info("Rebuilt grade rollup: %d buckets", buckets)
+    return buckets
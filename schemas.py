@@ -1,5 +1,5 @@
 import re
-from pydantic import BaseModel, EmailStr, ConfigDict, field_validator
+from pydantic import AliasChoices, BaseModel, EmailStr, ConfigDict, Field, field_validator
 from enum import Enum
 from datetime import date, datetime
 from typing import Optional, List
@@ -36,6 +36,11 @@ class GradeLevel(int, PyEnum):
     FORM_3 = 3
     FORM_4 = 4
 
+class Term(str, Enum):
+    TERM_1 = 'term_1'
+    TERM_2 = 'term_2'
+    TERM_3 = 'term_3'
+
 
 class Address(BaseModel):
     street: Optional[str] = None
@@ -97,7 +102,7 @@ class UserResponse(BaseModel):
     last_name: str
     gender: Gender
     phone: str
-    date_of_birth: Optional[date] = None
+    date_of_birth: Optional[date] = Field(None, validation_alias=AliasChoices("date_of_birth", "dob"))
     address: Optional[str] = None  # Changed to str to match database storage
     role: Roles
     department: Optional[Departments] = None
@@ -109,6 +114,12 @@ class UserResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserPage(BaseModel):
+    """One page of users; pass next_cursor back as ?cursor= for the next page."""
+    items: List[UserResponse]
+    next_cursor: Optional[str] = None
+
+
 
 class SubjectBase(BaseModel):
     name: str
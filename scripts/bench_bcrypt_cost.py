@@ -0,0 +1,68 @@
+"""
+Benchmark bcrypt throughput at each cost to choose BCRYPT_ROUNDS.
+
+Runs one hashing loop per core and reports hashes per second per core,
+total throughput and per-hash latency percentiles for every cost.
+
+Usage: python scripts/bench_bcrypt_cost.py [--costs 10 11 12 13] [--seconds 3]
+                                           [--workers N] [--p99-ms 250]
+"""
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from passlib.context import CryptContext
+
+
+def _hash_loop(rounds: int, seconds: float):
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline or not latencies:
+        started_at = time.perf_counter()
+        context.hash("BenchmarkPassw0rd!")
+        latencies.append(time.perf_counter() - started_at)
+    return latencies
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--costs", type=int, nargs="+", default=[10, 11, 12, 13])
+    parser.add_argument("--seconds", type=float, default=3.0, help="run time per cost")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="cores to load")
+    parser.add_argument("--p99-ms", type=float, default=None, help="login p99 budget for bcrypt alone")
+    args = parser.parse_args()
+
+    print(f"{'cost':>4} {'hash/s/core':>12} {'hash/s total':>13} {'p50 ms':>8} {'p99 ms':>8}")
+    best = None
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for rounds in args.costs:
+            started_at = time.perf_counter()
+            results = list(pool.map(_hash_loop, [rounds] * args.workers, [args.seconds] * args.workers))
+            elapsed = time.perf_counter() - started_at
+
+            latencies = [latency for worker in results for latency in worker]
+            per_core = statistics.mean(len(worker) / sum(worker) for worker in results)
+            p50 = _percentile(latencies, 50) * 1000
+            p99 = _percentile(latencies, 99) * 1000
+            print(f"{rounds:>4} {per_core:>12.1f} {len(latencies) / elapsed:>13.1f} {p50:>8.1f} {p99:>8.1f}")
+
+            if args.p99_ms is not None and p99 <= args.p99_ms:
+                best = rounds
+
+    if args.p99_ms is not None:
+        if best is None:
+            print(f"No tested cost meets a p99 of {args.p99_ms} ms")
+        else:
+            print(f"Highest cost within p99 {args.p99_ms} ms: BCRYPT_ROUNDS={best}")
+
+
+if __name__ == "__main__":
+    main()
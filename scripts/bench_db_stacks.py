@@ -0,0 +1,112 @@
+"""
+Compare sync and async database stacks under high concurrency.
+
+Seeds a database with users, then drives the same endpoints through the
+sync routers (threadpool + Session) and the async routers (AsyncSession)
+in-process over ASGI, reporting requests per second for each.
+
+Usage: DATABASE_URL=sqlite:////tmp/bench.db python scripts/bench_db_stacks.py
+           [--users 2000] [--requests 2000] [--concurrency 200]
+Without DATABASE_URL a temporary SQLite file is used (aiosqlite required).
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+os.environ.setdefault("HASH_EXECUTOR", "inline")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+import models  # noqa: E402
+from database import SessionLocal, dispose_async_engine, engine  # noqa: E402
+from security import create_access_token  # noqa: E402
+from users import router as users_router  # noqa: E402
+from users_async import router as users_async_router  # noqa: E402
+from roles.headteacher import router as headteacher_router  # noqa: E402
+from roles.headteacher_async import router as headteacher_async_router  # noqa: E402
+
+ROLES = [models.RoleEnum.STUDENT] * 8 + [models.RoleEnum.TEACHER, models.RoleEnum.PARENT]
+DEPARTMENTS = list(models.DepartmentEnum)
+
+
+def seed(count):
+    models.Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        headmaster = db.query(models.User).filter(models.User.role == models.RoleEnum.HEADMASTER).first()
+        if headmaster is None:
+            headmaster = models.User(
+                email="headmaster@bench-school.com", hashed_password="x", first_name="Head",
+                last_name="Master", gender=models.GenderEnum.OTHER, phone="+100000000",
+                role=models.RoleEnum.HEADMASTER
+            )
+            db.add(headmaster)
+        existing = db.query(models.User).count()
+        db.bulk_save_objects([
+            models.User(
+                email=f"user{i}@bench-school.com", hashed_password="x", first_name="User",
+                last_name=str(i), gender=models.GenderEnum.OTHER, phone="+100000000",
+                role=ROLES[i % len(ROLES)], department=DEPARTMENTS[i % len(DEPARTMENTS)]
+            )
+            for i in range(existing, count)
+        ])
+        db.commit()
+        return headmaster.id
+    finally:
+        db.close()
+
+
+async def drive(app, path, headers, total, concurrency):
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                response = await client.get(path, headers=headers)
+                response.raise_for_status()
+
+        await one()  # warm up caches and connections
+        started_at = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return total / (time.perf_counter() - started_at)
+
+
+async def compare(paths, headers, total, concurrency):
+    sync_app, async_app = FastAPI(), FastAPI()
+    sync_app.include_router(users_router)
+    sync_app.include_router(headteacher_router)
+    async_app.include_router(users_async_router)
+    async_app.include_router(headteacher_async_router)
+
+    print(f"{'endpoint':<28} {'sync req/s':>11} {'async req/s':>12}")
+    for path in paths:
+        sync_rps = await drive(sync_app, path, headers, total, concurrency)
+        async_rps = await drive(async_app, path, headers, total, concurrency)
+        print(f"{path:<28} {sync_rps:>11.0f} {async_rps:>12.0f}")
+
+    await dispose_async_engine()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    headmaster_id = seed(args.users)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(headmaster_id)})}"}
+
+    paths = ["/users/getUser/1", "/headteacher/stats", "/headteacher/departments"]
+    asyncio.run(compare(paths, headers, args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Compare the orjson fast path against response_model serialization.
+
+Seeds staff and students, then fetches 10k-row responses from /hr/staff
+and /headteacher/students as served (row tuples -> ORJSONResponse) and
+through the previous pipeline (ORM objects -> Pydantic models ->
+response_model revalidation -> stdlib JSON), reporting median latency.
+
+Usage: DATABASE_URL=sqlite:////tmp/bench.db python scripts/bench_fast_json.py
+           [--rows 10000] [--requests 20]
+Without DATABASE_URL a temporary SQLite file is used.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+os.environ.setdefault("HASH_EXECUTOR", "inline")
+os.environ.setdefault("MAX_PAGE_SIZE", "10000")
+os.environ.setdefault("MAX_STUDENT_PAGE_SIZE", "10000")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import List  # noqa: E402
+
+from fastapi import Depends, FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+import models  # noqa: E402
+import schemas  # noqa: E402
+from database import SessionLocal, engine, get_read_db  # noqa: E402
+from roles.hr import require_hr_role, router as hr_router  # noqa: E402
+from roles.headteacher import require_headteacher_role, router as headteacher_router  # noqa: E402
+from services import user_service  # noqa: E402
+
+STAFF_ROLES = [models.RoleEnum.TEACHER, models.RoleEnum.LIBRARIAN, models.RoleEnum.BURSER]
+
+
+def seed(rows):
+    models.Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        if db.query(models.User).count() < rows * 2:
+            db.bulk_save_objects([
+                models.User(
+                    email=f"user{i}@bench-school.com", hashed_password="x", first_name="User",
+                    last_name=str(i), gender=models.GenderEnum.OTHER, phone="+100000000",
+                    role=models.RoleEnum.STUDENT if i % 2 else STAFF_ROLES[i % 3],
+                    department=models.DepartmentEnum.SCIENCE
+                )
+                for i in range(rows * 2)
+            ])
+            db.commit()
+    finally:
+        db.close()
+
+
+def baseline_app():
+    """The same two routes as served before the fast path."""
+    app = FastAPI()
+
+    @app.get("/hr/staff", response_model=schemas.UserPage)
+    def staff(limit: int, db: Session = Depends(get_read_db)):
+        return user_service.list_users(db, STAFF_ROLES, None, None, limit)
+
+    @app.get("/headteacher/students", response_model=List[schemas.StudentStats])
+    def students(limit: int, db: Session = Depends(get_read_db)):
+        students = db.query(models.User).filter(
+            models.User.role == models.RoleEnum.STUDENT
+        ).limit(limit).all()
+        return [
+            schemas.StudentStats(
+                student_id=student.id, student_name=f"{student.first_name} {student.last_name}",
+                grade_level=None, total_subjects=0
+            )
+            for student in students
+        ]
+
+    return app
+
+
+def fast_app():
+    app = FastAPI()
+    app.include_router(hr_router)
+    app.include_router(headteacher_router)
+    app.dependency_overrides[require_hr_role] = lambda: None
+    app.dependency_overrides[require_headteacher_role] = lambda: None
+    return app
+
+
+def median_ms(client, path, params, requests):
+    client.get(path, params=params).raise_for_status()  # warm up
+    timings = []
+    for _ in range(requests):
+        started_at = time.perf_counter()
+        response = client.get(path, params=params)
+        timings.append(time.perf_counter() - started_at)
+        response.raise_for_status()
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    baseline, fast = TestClient(baseline_app()), TestClient(fast_app())
+
+    print(f"{'endpoint':<24} {'response_model ms':>18} {'orjson ms':>10} {'speedup':>8}")
+    for path in ("/hr/staff", "/headteacher/students"):
+        params = {"limit": args.rows}
+        slow_ms = median_ms(baseline, path, params, args.requests)
+        fast_ms = median_ms(fast, path, params, args.requests)
+        print(f"{path:<24} {slow_ms:>18.1f} {fast_ms:>10.1f} {slow_ms / fast_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Measure what sparse fieldsets save on the user list endpoints.
+
+Seeds users, then requests the same pages of /users/getUsers with every
+field and with a narrow ?fields= selection, reporting response bytes and
+latency per page for each.
+
+Usage: DATABASE_URL=sqlite:////tmp/bench.db python scripts/bench_sparse_fields.py
+           [--users 20000] [--limit 200] [--pages 50] [--fields first_name,last_name]
+Without DATABASE_URL a temporary SQLite file is used.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+os.environ.setdefault("HASH_EXECUTOR", "inline")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import models  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from users import router as users_router  # noqa: E402
+
+DEPARTMENTS = list(models.DepartmentEnum)
+
+
+def seed(count):
+    models.Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        existing = db.query(models.User).count()
+        db.bulk_save_objects([
+            models.User(
+                email=f"user{i}@bench-school.com", hashed_password="$2b$12$" + "x" * 53,
+                first_name="User", last_name=str(i), gender=models.GenderEnum.OTHER,
+                phone="+100000000", address="1 School Road, Village, City, 00000, Country",
+                qualification="BSc Education", role=models.RoleEnum.STUDENT,
+                department=DEPARTMENTS[i % len(DEPARTMENTS)]
+            )
+            for i in range(existing, count)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def walk(client, params, pages):
+    """Follow next_cursor for pages pages; returns (bytes per page, seconds per page)."""
+    sizes, timings, cursor = [], [], None
+    for _ in range(pages):
+        started_at = time.perf_counter()
+        response = client.get("/users/getUsers", params={**params, **({"cursor": cursor} if cursor else {})})
+        timings.append(time.perf_counter() - started_at)
+        response.raise_for_status()
+        sizes.append(len(response.content))
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            break
+    return statistics.mean(sizes), statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--fields", default="first_name,last_name")
+    args = parser.parse_args()
+
+    seed(args.users)
+    app = FastAPI()
+    app.include_router(users_router)
+    client = TestClient(app)
+
+    walk(client, {"limit": args.limit}, 1)  # warm up
+    full_bytes, full_time = walk(client, {"limit": args.limit}, args.pages)
+    sparse_bytes, sparse_time = walk(client, {"limit": args.limit, "fields": args.fields}, args.pages)
+
+    print(f"{'':<32} {'bytes/page':>11} {'ms/page':>9}")
+    print(f"{'all fields':<32} {full_bytes:>11.0f} {full_time * 1000:>9.2f}")
+    print(f"{'fields=' + args.fields:<32} {sparse_bytes:>11.0f} {sparse_time * 1000:>9.2f}")
+    print(f"reduction: {1 - sparse_bytes / full_bytes:.0%} bytes, {1 - sparse_time / full_time:.0%} latency")
+
+
+if __name__ == "__main__":
+    main()
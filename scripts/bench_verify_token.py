@@ -0,0 +1,47 @@
+"""
+Micro-benchmark: cold vs warm verify_token throughput.
+
+Usage: python scripts/bench_verify_token.py [--tokens 1000] [--rounds 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import security  # noqa: E402
+
+
+def run(tokens, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for token in tokens:
+            security.verify_token(token)
+    elapsed = time.perf_counter() - start
+    return len(tokens) * rounds / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=1000, help="distinct tokens")
+    parser.add_argument("--rounds", type=int, default=20, help="verifications per token")
+    args = parser.parse_args()
+
+    tokens = [security.create_access_token({"sub": str(i)}) for i in range(1, args.tokens + 1)]
+
+    security.JWT_CACHE_ENABLED = False
+    cold = run(tokens, args.rounds)
+
+    security.JWT_CACHE_ENABLED = True
+    security.token_cache.clear()
+    run(tokens, 1)  # populate the cache
+    warm = run(tokens, args.rounds)
+
+    print(f"cold (jwt.decode every call): {cold:>12,.0f} verifications/s")
+    print(f"warm (decoded-token cache):   {warm:>12,.0f} verifications/s")
+    print(f"speedup:                      {warm / cold:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
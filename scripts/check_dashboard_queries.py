@@ -0,0 +1,135 @@
+"""
+Query-count and latency check for the dashboard user counters.
+
+The counters are read from dashboard_counters (see counters.py); the
+per-counter COUNT queries over users serve as the reference.
+
+Seeds a large synthetic users table, then asserts that the dashboard stats,
+teacher-student ratio, recent registrations and department info each cost
+one query (the first three share one query inside the full dashboard), that
+the counters match the per-counter COUNT queries they replaced, and that
+reading them stays within a latency budget. Exits non-zero on failure.
+
+Usage: DATABASE_URL=sqlite:////tmp/dash.db python scripts/check_dashboard_queries.py
+           [--users 100000] [--runs 20] [--budget-ms 25]
+Without DATABASE_URL a temporary SQLite file is used.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/dash.db"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert  # noqa: E402
+
+import models  # noqa: E402
+from counters import dashboard_counters  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from query_stats import assert_max_queries, count_queries  # noqa: E402
+from services import dashboard_service  # noqa: E402
+
+ROLES = [models.RoleEnum.STUDENT] * 12 + [models.RoleEnum.TEACHER, models.RoleEnum.PARENT]
+DEPARTMENTS = list(models.DepartmentEnum) + [None]
+
+
+def seed(count):
+    models.Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        existing = db.query(models.User).count()
+    finally:
+        db.close()
+
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        for start in range(existing, count, 10000):
+            conn.execute(insert(models.User), [
+                dict(
+                    email=f"user{i}@check-school.com", hashed_password="x", first_name="User",
+                    last_name=str(i), gender=models.GenderEnum.OTHER, phone="+100000000",
+                    role=ROLES[i % len(ROLES)], department=DEPARTMENTS[i % len(DEPARTMENTS)],
+                    is_active=i % 10 != 0, created_at=now - timedelta(days=i % 365)
+                )
+                for i in range(start, min(start + 10000, count))
+            ])
+
+
+def legacy_counts(db):
+    """The eight COUNT queries the dashboard used to issue for the same numbers."""
+    User, Roles = models.User, models.RoleEnum
+    cutoff_date = datetime.utcnow() - timedelta(days=30)
+    return (
+        db.query(User).filter(User.role == Roles.STUDENT).count(),
+        db.query(User).filter(User.role == Roles.TEACHER).count(),
+        db.query(User).filter(User.role == Roles.PARENT).count(),
+        db.query(User.department).filter(User.department.isnot(None)).distinct().count(),
+        db.query(User).filter(User.is_active == True).count(),
+        db.query(User).filter(User.is_active == False).count(),
+        db.query(User).filter(User.role == Roles.TEACHER, User.is_active == True).count(),
+        db.query(User).filter(User.role == Roles.STUDENT, User.is_active == True).count(),
+        db.query(User).filter(User.role == Roles.STUDENT, User.created_at >= cutoff_date).count(),
+    )
+
+
+def median_ms(fn, runs):
+    timings = []
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started_at)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=25.0, help="median latency allowed for the counters")
+    args = parser.parse_args()
+
+    seed(args.users)
+    dashboard_counters.reconcile()  # the seed bypasses the ORM events
+    dashboard_service.invalidate_dashboard_cache()
+    db = SessionLocal()
+    try:
+        with assert_max_queries(1):
+            stats = dashboard_service.get_dashboard_stats(db)
+        with assert_max_queries(1):
+            ratio = dashboard_service.calculate_teacher_student_ratio(db)
+        with assert_max_queries(1):
+            recent = dashboard_service.get_recent_registrations(db, 30)
+        with assert_max_queries(1):
+            dashboard_service.get_department_info(db)
+        dashboard_service.invalidate_dashboard_cache()
+        with count_queries() as dashboard:
+            dashboard_service.get_headteacher_dashboard(db)
+        counter_scans = sum(n for sql, n in dashboard.statements.items() if "recent_students" in sql)
+        assert counter_scans == 1, f"dashboard ran the counter query {counter_scans} times"
+
+        counters = dashboard_service.get_user_counters(db)
+        expected = legacy_counts(db)
+        actual = (
+            stats.total_students, stats.total_teachers, stats.total_parents, stats.total_departments,
+            stats.active_users, stats.inactive_users, counters.active_teachers, counters.active_students, recent
+        )
+        assert actual == expected, f"counters {actual} != per-counter queries {expected}"
+
+        # .fn bypasses the dashboard cache
+        counters_ms = median_ms(lambda: dashboard_service.get_user_counters.fn(db), args.runs)
+        legacy_ms = median_ms(lambda: legacy_counts(db), args.runs)
+    finally:
+        db.close()
+
+    print(f"stats/ratio/recent/departments: 1 query each; dashboard shares 1 counter scan (ratio {ratio})")
+    print(f"{args.users} users: counters {counters_ms:.1f}ms vs per-counter queries {legacy_ms:.1f}ms")
+    assert counters_ms <= args.budget_ms, f"counters took {counters_ms:.1f}ms, budget is {args.budget_ms:.0f}ms"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Query-plan regression check for the hot access paths.
+
+Calls the dashboard and user-listing service functions in SERVICE_CALLS,
+captures the statements they execute, and runs EXPLAIN on each with its
+parameters against DATABASE_URL; HOT_QUERIES adds the single-table lookups
+the routers build inline. Exits non-zero if any of them would read a table
+with a full sequential scan, other than the tables a service call lists as
+expected. On PostgreSQL sequential scans are disabled for the check, so a
+Seq Scan in the plan means no usable index exists, regardless of table size.
+
+Usage: DATABASE_URL=... python scripts/check_query_plans.py [--create]
+  --create  create the schema first (for an empty SQLite database in CI)
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, select  # noqa: E402
+
+import models  # noqa: E402
+import schemas  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from pagination import encode_cursor  # noqa: E402
+from services import dashboard_service, user_service  # noqa: E402
+
+YEAR = "2024/2025"
+TERM = models.TermEnum.TERM_1
+CURSOR = encode_cursor(models.User(id=1, created_at=datetime(2024, 1, 1)))
+
+# name -> (call on a session, tables it is expected to read in full)
+SERVICE_CALLS = {
+    # A handful of counter rows; before they are populated the service
+    # falls back to one aggregate pass over users
+    "user counters": (
+        lambda db: dashboard_service.get_user_counters.fn(db), {"dashboard_counters", "users"}
+    ),
+    "recent registrations": (
+        lambda db: db.execute(dashboard_service._recent_students_query(30)).scalar(), set()
+    ),
+    "department info": (lambda db: dashboard_service.get_department_info.fn(db), set()),
+    "performance trends": (lambda db: dashboard_service.get_performance_trends(db, 6), set()),
+    "teacher statistics": (lambda db: dashboard_service.get_teacher_statistics(db, 0, 100), set()),
+    "teacher statistics by term": (
+        lambda db: dashboard_service.get_teacher_statistics(db, 0, 100, YEAR, schemas.Term.TERM_1), set()
+    ),
+    "student statistics": (lambda db: dashboard_service.get_student_statistics(db, 0, 100), set()),
+    "student statistics by term": (
+        lambda db: dashboard_service.get_student_statistics(db, 0, 100, YEAR, schemas.Term.TERM_1), set()
+    ),
+    "users page": (lambda db: user_service.list_users(db, cursor=CURSOR, limit=100), set()),
+    "users by role page": (
+        lambda db: user_service.get_users_by_role(db, schemas.Roles.TEACHER, CURSOR, 100), set()
+    ),
+    "user rows page": (
+        lambda db: user_service.list_user_rows(db, [schemas.Roles.STUDENT], cursor=CURSOR, limit=100), set()
+    ),
+}
+
+HOT_QUERIES = {
+    "users by role": select(models.User).where(models.User.role == models.RoleEnum.TEACHER),
+    "grades by student and term": select(models.Grade).where(
+        models.Grade.student_id == 1, models.Grade.academic_year == YEAR, models.Grade.term == TERM
+    ),
+    "grades by class and term": select(models.Grade).where(
+        models.Grade.class_id == 1, models.Grade.academic_year == YEAR, models.Grade.term == TERM
+    ),
+    "grades by subject and date": select(models.Grade).where(
+        models.Grade.subject_id == 1, models.Grade.assessment_date >= date(2024, 1, 1)
+    ),
+    "attendance by class and date": select(models.Attendance).where(
+        models.Attendance.class_id == 1, models.Attendance.date == date(2024, 1, 8)
+    ),
+    "attendance by student": select(models.Attendance).where(
+        models.Attendance.student_id == 1, models.Attendance.date >= date(2024, 1, 1)
+    ),
+    "enrollments by student": select(models.Enrollment).where(models.Enrollment.student_id == 1),
+    "enrollments by class": select(models.Enrollment).where(
+        models.Enrollment.class_id == 1, models.Enrollment.status == "active"
+    ),
+    "classes by teacher and term": select(models.Class).where(
+        models.Class.teacher_id == 1, models.Class.academic_year == YEAR, models.Class.term == TERM
+    ),
+    "fees by student and term": select(models.Fee).where(
+        models.Fee.student_id == 1, models.Fee.academic_year == YEAR, models.Fee.term == TERM
+    ),
+    "fees by term and status": select(models.Fee).where(
+        models.Fee.academic_year == YEAR, models.Fee.term == TERM, models.Fee.payment_status == "overdue"
+    ),
+    "payments by fee": select(models.Payment).where(models.Payment.fee_id == 1),
+    "children of parent": select(models.ParentStudent).where(models.ParentStudent.parent_id == 1),
+    "parents of student": select(models.ParentStudent).where(models.ParentStudent.student_id == 1),
+    "revoked tokens to prune": select(models.RevokedToken.jti).where(
+        models.RevokedToken.expires_at <= datetime(2024, 1, 1)
+    ),
+}
+
+
+@contextmanager
+def captured_statements():
+    """Collect (sql, parameters) for every statement this thread executes."""
+    thread = threading.get_ident()
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == thread and statement.split(None, 1)[0].upper() in ("SELECT", "WITH"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _postgres_scans(conn, sql, parameters):
+    conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}", parameters).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    scans = []
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node.get("Node Type") == "Seq Scan":
+            scans.append(node.get("Relation Name"))
+        nodes.extend(node.get("Plans", []))
+    return scans
+
+
+def _sqlite_scans(conn, sql, parameters):
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", parameters).all()
+    # "SCAN <name>" without an index; CTEs and subqueries appear as SCAN too
+    details = [row[-1] for row in rows if row[-1].startswith("SCAN ") and " USING " not in row[-1]]
+    return [detail.split()[1] for detail in details if detail.split()[1] in models.Base.metadata.tables]
+
+
+def explain_scans(conn, sql, parameters=()):
+    """Tables the plan for sql reads with a full sequential scan."""
+    with conn.begin():
+        if conn.dialect.name == "postgresql":
+            return _postgres_scans(conn, sql, parameters)
+        return _sqlite_scans(conn, sql, parameters)
+
+
+def _report(name, scans):
+    if scans:
+        print(f"FAIL {name}: full scan of {', '.join(map(str, scans))}")
+        return 1
+    print(f"ok   {name}")
+    return 0
+
+
+def check_service_calls(calls):
+    failures = 0
+    db = SessionLocal()
+    try:
+        for name, (call, expected_scans) in calls.items():
+            with captured_statements() as statements:
+                call(db)
+            db.rollback()
+
+            scans = []
+            with engine.connect() as conn:
+                for sql, parameters in statements:
+                    scans.extend(scan for scan in explain_scans(conn, sql, parameters) if scan not in expected_scans)
+            failures += _report(f"{name} ({len(statements)} statement{'s' * (len(statements) != 1)})", scans)
+    finally:
+        db.close()
+    return failures
+
+
+def check(queries):
+    failures = 0
+    with engine.connect() as conn:
+        for name, statement in queries.items():
+            sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+            failures += _report(name, explain_scans(conn, sql))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--create", action="store_true", help="create the schema before checking")
+    args = parser.parse_args()
+
+    if args.create:
+        models.Base.metadata.create_all(engine)
+
+    failures = check_service_calls(SERVICE_CALLS) + check(HOT_QUERIES)
+    if failures:
+        print(f"{failures} hot quer{'y' if failures == 1 else 'ies'} regressed to a full scan")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
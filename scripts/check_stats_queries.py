@@ -0,0 +1,198 @@
+"""
+Query-count check for the headteacher teacher and student statistics.
+
+Seeds teachers, students, classes over two academic years and three terms,
+enrollments (some dropped), grades and attendance, then asserts that a page
+of teacher or student statistics costs one query whatever its size, with
+and without the academic year / term filters, and that the numbers match
+per-teacher and per-student reference queries. Exits non-zero on failure.
+
+Usage: DATABASE_URL=sqlite:////tmp/stats.db python scripts/check_stats_queries.py
+           [--teachers 200] [--students 2000] [--page 100] [--student-page 1000]
+Without DATABASE_URL a temporary SQLite file is used.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/stats.db"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+import models  # noqa: E402
+import schemas  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from query_stats import assert_max_queries  # noqa: E402
+from services import dashboard_service  # noqa: E402
+
+YEARS = ["2025/2026", "2026/2027"]
+TERMS = list(models.TermEnum)
+
+
+def seed(teachers, students, seed_value=7):
+    models.Base.metadata.create_all(engine)
+    rng = random.Random(seed_value)
+    with engine.begin() as conn:
+        if conn.execute(select(func.count()).select_from(models.Class.__table__)).scalar():
+            return
+
+        def users(role, count, prefix):
+            conn.execute(insert(models.User), [
+                dict(
+                    email=f"{prefix}{i}@check-school.com", hashed_password="x", first_name=prefix.title(),
+                    last_name=str(i), gender=models.GenderEnum.OTHER, phone="+100000000", role=role,
+                    department=list(models.DepartmentEnum)[i % 3] if role == models.RoleEnum.TEACHER else None,
+                    # Half the students have no grade level of their own
+                    grade_level=rng.randint(1, 4) if role == models.RoleEnum.STUDENT and i % 2 else None
+                )
+                for i in range(count)
+            ])
+            return list(conn.execute(select(models.User.id).where(models.User.role == role)).scalars())
+
+        teacher_ids = users(models.RoleEnum.TEACHER, teachers, "teacher")
+        student_ids = users(models.RoleEnum.STUDENT, students, "student")
+        conn.execute(insert(models.Subject), [dict(name=f"Subject {i}", code=f"S{i}") for i in range(8)])
+        subject_ids = list(conn.execute(select(models.Subject.id)).scalars())
+
+        # Every fifth teacher has no classes at all
+        conn.execute(insert(models.Class), [
+            dict(
+                name=f"Class {teacher_id}-{n}", subject_id=rng.choice(subject_ids), teacher_id=teacher_id,
+                grade_level=rng.randint(1, 4), academic_year=rng.choice(YEARS), term=rng.choice(TERMS)
+            )
+            for teacher_id in teacher_ids if teacher_id % 5
+            for n in range(rng.randint(1, 4))
+        ])
+        classes = conn.execute(select(models.Class.id, models.Class.subject_id, models.Class.academic_year,
+                                      models.Class.term)).all()
+
+        enrollments, grades, attendance = [], [], []
+        for cls in classes:
+            for student_id in rng.sample(student_ids, rng.randint(0, 30)):
+                enrollments.append(dict(
+                    student_id=student_id, class_id=cls.id, status="dropped" if rng.random() < 0.1 else "active"
+                ))
+                for n in range(rng.randint(0, 3)):
+                    grades.append(dict(
+                        student_id=student_id, class_id=cls.id, subject_id=cls.subject_id,
+                        assessment_type="quiz", score=rng.uniform(0, 50), max_score=50.0,
+                        percentage=None if n else rng.uniform(0, 100), assessment_name=f"Quiz {n}",
+                        assessment_date=date(2026, 1, 1) + timedelta(days=rng.randint(0, 300)),
+                        academic_year=cls.academic_year, term=cls.term
+                    ))
+                for n in range(rng.randint(0, 5)):
+                    attendance.append(dict(
+                        student_id=student_id, class_id=cls.id, date=date(2026, 1, 5) + timedelta(days=n),
+                        status=rng.choice(list(models.AttendanceStatusEnum))
+                    ))
+        conn.execute(insert(models.Enrollment), enrollments)
+        conn.execute(insert(models.Grade), grades)
+        conn.execute(insert(models.Attendance), attendance)
+
+
+def reference_teacher_stats(db, teacher_ids, academic_year, term):
+    """The per-teacher queries the statistics used to need, as (classes, students, average)."""
+    expected = {}
+    for teacher_id in teacher_ids:
+        classes = db.query(models.Class).filter(models.Class.teacher_id == teacher_id)
+        if academic_year is not None:
+            classes = classes.filter(models.Class.academic_year == academic_year)
+        if term is not None:
+            classes = classes.filter(models.Class.term == term)
+        classes = classes.all()
+        class_ids = [cls.id for cls in classes]
+        students = {
+            enrollment.student_id
+            for enrollment in db.query(models.Enrollment).filter(models.Enrollment.class_id.in_(class_ids))
+            if enrollment.status != "dropped"
+        }
+        percents = [
+            grade.percentage if grade.percentage is not None else grade.score * 100.0 / (grade.max_score or 100.0)
+            for grade in db.query(models.Grade).filter(models.Grade.class_id.in_(class_ids))
+        ]
+        average = round(sum(percents) / len(percents), 2) if percents else None
+        expected[teacher_id] = (len(classes), len(students), average)
+    return expected
+
+
+def reference_student_stats(db, student_ids, academic_year, term):
+    """Per-student queries for the same numbers, keyed by student id."""
+    expected = {}
+    for student_id in student_ids:
+        student = db.get(models.User, student_id)
+        classes = {}
+        for enrollment in db.query(models.Enrollment).filter(models.Enrollment.student_id == student_id):
+            cls = db.get(models.Class, enrollment.class_id)
+            if enrollment.status != "dropped" and (academic_year in (None, cls.academic_year)) \
+                    and (term in (None, cls.term)):
+                classes[cls.id] = cls
+        grades = [
+            grade for grade in db.query(models.Grade).filter(models.Grade.student_id == student_id)
+            if academic_year in (None, grade.academic_year) and term in (None, grade.term)
+        ]
+        percents = [
+            grade.percentage if grade.percentage is not None else grade.score * 100.0 / (grade.max_score or 100.0)
+            for grade in grades
+        ]
+        records = []
+        for record in db.query(models.Attendance).filter(models.Attendance.student_id == student_id):
+            cls = db.get(models.Class, record.class_id)
+            if academic_year in (None, cls.academic_year) and term in (None, cls.term):
+                records.append(record.status)
+        attended = sum(status in ("present", "late") for status in records)
+        expected_records = sum(status != "excused" for status in records)
+        expected[student_id] = (
+            student.grade_level if student.grade_level is not None
+            else max((cls.grade_level for cls in classes.values()), default=None),
+            len({cls.subject_id for cls in classes.values()}),
+            round(sum(percents) / len(percents), 2) if percents else None,
+            round(attended * 100.0 / expected_records, 2) if expected_records else None,
+        )
+    return expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teachers", type=int, default=200)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--student-page", type=int, default=1000)
+    args = parser.parse_args()
+
+    seed(args.teachers, args.students)
+    db = SessionLocal()
+    try:
+        for academic_year, term in [(None, None), (YEARS[1], None), (YEARS[0], schemas.Term.TERM_2)]:
+            for skip in range(0, args.teachers, args.page):
+                with assert_max_queries(1):
+                    stats = dashboard_service.get_teacher_statistics(db, skip, args.page, academic_year, term)
+                actual = {s.teacher_id: (s.total_classes, s.total_students, s.average_performance) for s in stats}
+                expected = reference_teacher_stats(db, actual, academic_year, term)
+                assert actual == expected, f"teacher stats differ from the reference ({academic_year}, {term})"
+            print(f"teachers (year={academic_year}, term={term and term.value}): "
+                  f"1 query per page of {args.page}, matches per-teacher queries")
+
+            for skip in range(0, args.students, args.student_page):
+                with assert_max_queries(1):
+                    stats = dashboard_service.get_student_statistics(
+                        db, skip, args.student_page, academic_year, term
+                    )
+                actual = {
+                    s["student_id"]: (s["grade_level"], s["total_subjects"], s["average_score"], s["attendance_rate"])
+                    for s in stats
+                }
+                expected = reference_student_stats(db, actual, academic_year, term)
+                assert actual == expected, f"student stats differ from the reference ({academic_year}, {term})"
+            print(f"students (year={academic_year}, term={term and term.value}): "
+                  f"1 query per page of {args.student_page}, matches per-student queries")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
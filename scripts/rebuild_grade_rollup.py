@@ -0,0 +1,17 @@
+"""
+Recompute grade_monthly_rollup from the grades table.
+
+Run after bulk-loading grades outside the ORM or after changing PASS_MARK:
+
+    python scripts/rebuild_grade_rollup.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rollups  # noqa: E402
+
+
+if __name__ == "__main__":
+    print(f"Rebuilt {rollups.rebuild_grade_rollup()} rollup buckets")
@@ -4,17 +4,28 @@ from jose import jwt
 from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
-from typing import Optional
+from typing import NamedTuple, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+import time
 import uuid
 import os
 from dotenv import load_dotenv
-from models import User
+from dataclasses import dataclass
+from models import User, RoleEnum, DepartmentEnum
+from cache import TTLCache
+from presence import presence_buffer
 from database import get_db
+from hashing import (
+    get_hash_executor,
+    hash_password_sync,
+    verify_password_sync,
+    check_password_sync,
+    pwd_context
+)
 
 
 security = HTTPBearer()
@@ -22,27 +33,70 @@ security = HTTPBearer()
 load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY", "fallback-secret-key-for-testing")
 ALGORITHM = "HS256"
+JWT_CACHE_ENABLED = os.getenv("JWT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+# The principal cache is per process: invalidate_principal only evicts in the
+# worker that served the write, so other workers keep authorizing the old
+# principal (still active, old role) for up to this many seconds. 0 disables it.
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "10"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Slim, immutable snapshot of an authenticated user."""
+    id: int
+    role: RoleEnum
+    department: Optional[DepartmentEnum]
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            role=user.role,
+            department=user.department,
+            is_active=user.is_active,
+        )
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-def get_password_hash(password: str) -> str:
-    """Hash a password using bcrypt."""
-    # Always hash long passwords with SHA256 first to stay within bcrypt's 72-byte limit
-    password_bytes = password.encode("utf-8")
-    if len(password_bytes) > 72:
-        # Use SHA256 to reduce the password to a fixed length
-        password = hashlib.sha256(password_bytes).hexdigest()
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+
+
+def invalidate_principal(user_id: int) -> None:
+    """
+    Drop a cached principal after the user's account changes.
     
-    return pwd_context.hash(password)
+    Only this process's cache is cleared; other workers pick the change up
+    when their entry expires, within PRINCIPAL_CACHE_TTL seconds.
+    """
+    principal_cache.invalidate(user_id)
+
+
+def get_password_hash(password: str) -> str:
+    """Hash a password using bcrypt on the hashing executor."""
+    return get_hash_executor().run(hash_password_sync, password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against a hashed password."""
-    # Apply the same transformation as in hashing
-    password_bytes = plain_password.encode("utf-8")
-    if len(password_bytes) > 72:
-        plain_password = hashlib.sha256(password_bytes).hexdigest()
-    
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify a plain password against a hashed password on the hashing executor."""
+    return get_hash_executor().run(verify_password_sync, plain_password, hashed_password)
+
+class PasswordCheck(NamedTuple):
+    """Result of a password check; needs_rehash means the hash uses an old cost."""
+    valid: bool
+    needs_rehash: bool
+
+def check_password(plain_password: str, hashed_password: str) -> PasswordCheck:
+    """Verify a password and report whether the stored hash should be upgraded."""
+    return PasswordCheck(*get_hash_executor().run(check_password_sync, plain_password, hashed_password))
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password from an async route without blocking the event loop."""
+    return await get_hash_executor().run_async(hash_password_sync, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password from an async route without blocking the event loop."""
+    return await get_hash_executor().run_async(verify_password_sync, plain_password, hashed_password)
 
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     """Create a JWT access token."""
@@ -56,7 +110,8 @@ def create_refresh_token(data: dict, expires_delta: timedelta = None) -> str:
     """Create a JWT refresh token."""
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(days=7))
-    to_encode.update({"exp": expire, "type": "refresh"})
+    # jti makes each refresh token individually revocable
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -66,42 +121,72 @@ def create_refresh_token(data: dict, expires_delta: timedelta = None) -> str:
 
 
 
-def verify_token(token: str, token_type: str = "access"):
-    """Verify and decode a JWT token"""
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+class TokenClaims(NamedTuple):
+    """Verified claims kept in the decoded-token cache."""
+    user_id: int
+    token_type: str
+    exp: int
+    jti: Optional[str] = None
+
+
+# Verified tokens keyed by SHA256 digest; each entry expires at the token's exp
+token_cache = TTLCache(maxsize=JWT_CACHE_SIZE, ttl=0)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials"
+    )
+
+def decode_token(token: str, token_type: str = "access") -> TokenClaims:
+    """Verify a JWT token and return its claims, skipping the signature check for cached tokens."""
+    cache_key = hashlib.sha256(token.encode("utf-8")).digest()
+    claims = token_cache.get(cache_key) if JWT_CACHE_ENABLED else None
+
+    if claims is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            raise _credentials_exception()
+
         user_id: str = payload.get("sub")
-        token_type_check: str = payload.get("type")
-        
-        if user_id is None or token_type_check != token_type:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials"
-            )
-        return int(user_id)
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
+        if user_id is None:
+            raise _credentials_exception()
+
+        claims = TokenClaims(
+            int(user_id), payload.get("type"), payload.get("exp"), payload.get("jti")
         )
+        if JWT_CACHE_ENABLED and claims.exp is not None:
+            token_cache.set(cache_key, claims, ttl=claims.exp - time.time())
 
-async def get_current_user(
+    if claims.token_type != token_type:
+        raise _credentials_exception()
+    return claims
+
+def verify_token(token: str, token_type: str = "access"):
+    """Verify and decode a JWT token"""
+    return decode_token(token, token_type).user_id
+
+def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-):
-   
-    
+) -> Principal:
+    """Get the current authenticated user, served from the principal cache when possible."""
     user_id = verify_token(credentials.credentials)
-    user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
-    
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    
-    # Update last seen
-    user.last_seen_at = datetime.utcnow()
-    db.commit()
-    
-    return user
\ No newline at end of file
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found"
+            )
+
+        principal = Principal.from_user(user)
+        principal_cache.set(user_id, principal)
+
+    # Update last seen through the write-behind buffer
+    presence_buffer.touch(user_id)
+    return principal
@@ -0,0 +1,68 @@
+"""
+Async Dashboard Service - AsyncSession entry points for dashboard_service
+
+The aggregate logic lives once in dashboard_service; these wrappers run it
+through AsyncSession.run_sync so async routers get the same results without
+holding a threadpool thread while the queries are in flight. Cached
+functions go through call_async, which shares their cache and coalesces
+concurrent misses with the sync routers.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional
+import schemas
+from services import dashboard_service
+
+
+async def get_dashboard_stats(db: AsyncSession) -> schemas.DashboardStats:
+    """Get overall dashboard statistics."""
+    counters = await dashboard_service.get_user_counters.call_async(db)
+    return await db.run_sync(dashboard_service.get_dashboard_stats, counters)
+
+
+async def get_department_info(db: AsyncSession) -> List[schemas.DepartmentInfo]:
+    """Get information about each department including HOD."""
+    return await dashboard_service.get_department_info.call_async(db)
+
+
+async def get_performance_trends(db: AsyncSession, months: int = 6) -> List[schemas.PerformanceTrend]:
+    """Get performance trends for the last N months."""
+    return await db.run_sync(dashboard_service.get_performance_trends, months)
+
+
+async def get_recent_registrations(db: AsyncSession, days: int = 30) -> int:
+    """Get number of students registered in the last N days."""
+    counters = await dashboard_service.get_user_counters.call_async(db, recent_days=days)
+    return counters.recent_students
+
+
+async def calculate_teacher_student_ratio(db: AsyncSession) -> str:
+    """Calculate teacher to student ratio."""
+    counters = await dashboard_service.get_user_counters.call_async(db)
+    return await db.run_sync(dashboard_service.calculate_teacher_student_ratio, counters)
+
+
+async def get_headteacher_dashboard(db: AsyncSession) -> schemas.HeadteacherDashboard:
+    """Get complete dashboard data for headteacher."""
+    return await dashboard_service.get_headteacher_dashboard.call_async(db)
+
+
+async def get_teacher_statistics(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    academic_year: Optional[str] = None,
+    term: Optional[schemas.Term] = None
+) -> List[schemas.TeacherStats]:
+    """Get statistics for a page of teachers, optionally for one academic year and term."""
+    return await db.run_sync(dashboard_service.get_teacher_statistics, skip, limit, academic_year, term)
+
+
+async def get_student_statistics(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    academic_year: Optional[str] = None,
+    term: Optional[schemas.Term] = None
+) -> List[Dict]:
+    """Get statistics for a page of students, as StudentStats-shaped dicts."""
+    return await db.run_sync(dashboard_service.get_student_statistics, skip, limit, academic_year, term)
@@ -0,0 +1,125 @@
+"""
+Async User Service - AsyncSession counterparts of user_service
+"""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, status
+from typing import Iterable, Optional, Sequence
+import models
+import schemas
+from fieldsets import user_load_options
+from pagination import build_page, users_page_query
+from security import get_password_hash_async, invalidate_principal
+from services import dashboard_service
+from services.user_service import build_user
+
+
+async def create_user(
+    db: AsyncSession,
+    user_data: schemas.CreateUser,
+    created_by: Optional[int] = None
+) -> models.User:
+    """Create a new user in the database; see user_service.create_user."""
+    existing_user = await get_user_by_email(db, user_data.email)
+    
+    if existing_user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User with this email already exists"
+        )
+    
+    # Hash password without blocking the event loop
+    hashed_password = await get_password_hash_async(user_data.password)
+    new_user = build_user(user_data, hashed_password)
+    
+    db.add(new_user)
+    await db.commit()
+    await db.refresh(new_user)
+    dashboard_service.invalidate_dashboard_cache()
+    
+    return new_user
+
+
+async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[models.User]:
+    """Get user by ID."""
+    return await db.scalar(select(models.User).where(models.User.id == user_id))
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[models.User]:
+    """Get user by email."""
+    return await db.scalar(select(models.User).where(models.User.email == email))
+
+
+async def list_users(
+    db: AsyncSession,
+    roles: Optional[Iterable[schemas.Roles]] = None,
+    department: Optional[schemas.Departments] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None
+) -> dict:
+    """Get one keyset page of users; see user_service.list_users."""
+    query = users_page_query(roles, department, cursor, limit)
+    if fields:
+        query = query.options(user_load_options(fields))
+    rows = (await db.scalars(query)).all()
+    return build_page(rows, limit)
+
+
+async def get_users_by_role(
+    db: AsyncSession,
+    role: schemas.Roles,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    department: Optional[schemas.Departments] = None,
+    fields: Optional[Sequence[str]] = None
+) -> dict:
+    """Get one keyset page of users with the given role."""
+    return await list_users(db, [role], department, cursor, limit, fields)
+
+
+async def _get_user_or_404(db: AsyncSession, user_id: int) -> models.User:
+    user = await get_user_by_id(db, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
+
+
+async def update_user(db: AsyncSession, user_id: int, user_data: dict) -> models.User:
+    """Update user information."""
+    user = await _get_user_or_404(db, user_id)
+    
+    for key, value in user_data.items():
+        if hasattr(user, key) and value is not None:
+            setattr(user, key, value)
+    
+    await db.commit()
+    await db.refresh(user)
+    invalidate_principal(user.id)
+    dashboard_service.invalidate_dashboard_cache()
+    return user
+
+
+async def deactivate_user(db: AsyncSession, user_id: int) -> models.User:
+    """Deactivate a user account."""
+    user = await _get_user_or_404(db, user_id)
+    user.is_active = False
+    await db.commit()
+    await db.refresh(user)
+    invalidate_principal(user.id)
+    dashboard_service.invalidate_dashboard_cache()
+    return user
+
+
+async def activate_user(db: AsyncSession, user_id: int) -> models.User:
+    """Activate a user account."""
+    user = await _get_user_or_404(db, user_id)
+    user.is_active = True
+    await db.commit()
+    await db.refresh(user)
+    invalidate_principal(user.id)
+    dashboard_service.invalidate_dashboard_cache()
+    return user
@@ -2,175 +2,301 @@
 Dashboard Service - Business logic for dashboard data
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from sqlalchemy import and_, case, func, select
+from datetime import date, datetime, timedelta
+import os
+from typing import List, Dict, NamedTuple, Optional
 import models
 import schemas
+from cache import cached_query, invalidate_query_group, query_group_stats
+from database import DATABASE_REPLICA_URLS, ReadSessionLocal, SessionLocal
+import rollups  # also keeps grade_monthly_rollup in step with Grade writes
 
 
-def get_dashboard_stats(db: Session) -> schemas.DashboardStats:
-    """Get overall dashboard statistics."""
-    
-    # Count users by role
-    total_students = db.query(models.User).filter(
-        models.User.role == schemas.Roles.STUDENT
-    ).count()
+# Per-function cache TTLs (seconds); 0 disables caching for that function
+DASHBOARD_COUNTERS_TTL = float(os.getenv("DASHBOARD_COUNTERS_TTL", "30"))
+DASHBOARD_DEPARTMENTS_TTL = float(os.getenv("DASHBOARD_DEPARTMENTS_TTL", "300"))
+DASHBOARD_TTL = float(os.getenv("DASHBOARD_TTL", "30"))
+# Serve expired entries this much longer while they refresh in the background
+DASHBOARD_STALE_SECONDS = float(os.getenv("DASHBOARD_STALE_SECONDS", "0"))
+DASHBOARD_CACHE_SIZE = int(os.getenv("DASHBOARD_CACHE_SIZE", "64"))
+# After a write invalidates the cache, recompute on the primary for this long;
+# set it above the worst replica lag. Only used when read replicas are configured.
+DASHBOARD_READ_PRIMARY_SECONDS = float(os.getenv("DASHBOARD_READ_PRIMARY_SECONDS", "30"))
+
+DASHBOARD_CACHE = "dashboard"
+
+# Longest history /headteacher/performance-trends serves
+MAX_TREND_MONTHS = int(os.getenv("MAX_TREND_MONTHS", "60"))
+# Largest pages /headteacher/teachers and /headteacher/students serve; statistics are batched per page
+MAX_TEACHER_PAGE_SIZE = int(os.getenv("MAX_TEACHER_PAGE_SIZE", "200"))
+MAX_STUDENT_PAGE_SIZE = int(os.getenv("MAX_STUDENT_PAGE_SIZE", "1000"))
+
+
+def _dashboard_cache(ttl: float):
+    return cached_query(
+        DASHBOARD_CACHE,
+        ttl=ttl,
+        maxsize=DASHBOARD_CACHE_SIZE,
+        stale_ttl=DASHBOARD_STALE_SECONDS,
+        session_factory=ReadSessionLocal,
+        primary_session_factory=SessionLocal if DATABASE_REPLICA_URLS else None,
+        primary_window=DASHBOARD_READ_PRIMARY_SECONDS
+    )
+
+
+def invalidate_dashboard_cache() -> None:
+    """Drop cached dashboard results; called after user writes that change them."""
+    invalidate_query_group(DASHBOARD_CACHE)
+
+
+def dashboard_cache_stats() -> Dict[str, Dict]:
+    """Hit, miss, stale and refresh counters per cached dashboard function."""
+    return query_group_stats(DASHBOARD_CACHE)
+
+
+def _count_where(condition):
+    """COUNT(CASE WHEN condition THEN 1 END): a portable COUNT(*) FILTER (WHERE ...)."""
+    return func.count(case((condition, 1)))
+
+
+class UserCounters(NamedTuple):
+    """Users-table counters behind the dashboard stats, ratio and recent registrations."""
+    total_students: int
+    total_teachers: int
+    total_parents: int
+    total_departments: int
+    active_users: int
+    inactive_users: int
+    active_teachers: int
+    active_students: int
+    recent_students: int
+
+
+def _recent_students_query(recent_days: int):
+    cutoff_date = datetime.utcnow() - timedelta(days=recent_days)
+    return select(func.count()).select_from(models.User).where(
+        models.User.role == schemas.Roles.STUDENT,
+        models.User.created_at >= cutoff_date
+    )
+
+
+def _scan_user_counters(db: Session, recent_days: int) -> UserCounters:
+    """All counters from one aggregate scan of users."""
+    User = models.User
+    cutoff_date = datetime.utcnow() - timedelta(days=recent_days)
     
-    total_teachers = db.query(models.User).filter(
-        models.User.role == schemas.Roles.TEACHER
-    ).count()
+    row = db.execute(
+        select(
+            _count_where(User.role == schemas.Roles.STUDENT).label("total_students"),
+            _count_where(User.role == schemas.Roles.TEACHER).label("total_teachers"),
+            _count_where(User.role == schemas.Roles.PARENT).label("total_parents"),
+            func.count(User.department.distinct()).label("total_departments"),
+            _count_where(User.is_active == True).label("active_users"),
+            _count_where(User.is_active == False).label("inactive_users"),
+            _count_where(and_(User.role == schemas.Roles.TEACHER, User.is_active == True)).label("active_teachers"),
+            _count_where(and_(User.role == schemas.Roles.STUDENT, User.is_active == True)).label("active_students"),
+            _count_where(and_(
+                User.role == schemas.Roles.STUDENT, User.created_at >= cutoff_date
+            )).label("recent_students"),
+        )
+    ).one()
+    return UserCounters(**row._mapping)
+
+
+@_dashboard_cache(DASHBOARD_COUNTERS_TTL)
+def get_user_counters(db: Session, recent_days: int = 30) -> UserCounters:
+    """
+    Every users-table counter the dashboard needs, in one round trip.
     
-    total_parents = db.query(models.User).filter(
-        models.User.role == schemas.Roles.PARENT
-    ).count()
+    Reads the handful of dashboard_counters rows (see counters.py) with the
+    recent-registrations count, an index range scan, alongside. Before the
+    counters have been populated it falls back to one aggregate scan.
+    Cached; the stats, ratio and recent-registrations endpoints share it.
+    """
+    counter = models.DashboardCounter
+    rows = db.execute(
+        select(
+            counter.role,
+            counter.department,
+            counter.is_active,
+            counter.count,
+            _recent_students_query(recent_days).scalar_subquery().label("recent_students"),
+        )
+    ).all()
     
-    # Count unique departments
-    total_departments = db.query(models.User.department).filter(
-        models.User.department.isnot(None)
-    ).distinct().count()
+    if not rows:
+        return _scan_user_counters(db, recent_days)
     
-    # Active vs inactive users
-    active_users = db.query(models.User).filter(
-        models.User.is_active == True
-    ).count()
+    def total(role=None, is_active=None):
+        return sum(
+            row.count for row in rows
+            if (role is None or row.role == role.value) and (is_active is None or row.is_active == is_active)
+        )
     
-    inactive_users = db.query(models.User).filter(
-        models.User.is_active == False
-    ).count()
+    Roles = schemas.Roles
+    return UserCounters(
+        total_students=total(Roles.STUDENT),
+        total_teachers=total(Roles.TEACHER),
+        total_parents=total(Roles.PARENT),
+        total_departments=len({row.department for row in rows if row.department and row.count > 0}),
+        active_users=total(is_active=True),
+        inactive_users=total(is_active=False),
+        active_teachers=total(Roles.TEACHER, True),
+        active_students=total(Roles.STUDENT, True),
+        recent_students=rows[0].recent_students,
+    )
+
+
+def get_dashboard_stats(db: Session, counters: Optional[UserCounters] = None) -> schemas.DashboardStats:
+    """Get overall dashboard statistics; counters from get_user_counters saves the query."""
+    counters = counters or get_user_counters(db)
     
     return schemas.DashboardStats(
-        total_students=total_students,
-        total_teachers=total_teachers,
-        total_departments=total_departments,
-        total_parents=total_parents,
-        active_users=active_users,
-        inactive_users=inactive_users
+        total_students=counters.total_students,
+        total_teachers=counters.total_teachers,
+        total_departments=counters.total_departments,
+        total_parents=counters.total_parents,
+        active_users=counters.active_users,
+        inactive_users=counters.inactive_users
     )
 
 
+@_dashboard_cache(DASHBOARD_DEPARTMENTS_TTL)
 def get_department_info(db: Session) -> List[schemas.DepartmentInfo]:
-    """Get information about each department including HOD."""
-    
-    departments_data = []
-    
-    # Get all unique departments
-    departments = db.query(models.User.department).filter(
-        models.User.department.isnot(None)
-    ).distinct().all()
-    
-    for (dept,) in departments:
-        # Count teachers in this department
-        total_teachers = db.query(models.User).filter(
-            models.User.department == dept,
-            models.User.role == schemas.Roles.TEACHER
-        ).count()
-        
-        # Count students in this department (if applicable)
-        total_students = db.query(models.User).filter(
-            models.User.department == dept,
-            models.User.role == schemas.Roles.STUDENT
-        ).count()
-        
-        # Find HOD - for now, we'll take the most senior teacher (earliest created_at)
-        # You might want to add a specific 'is_hod' field to User model later
-        hod = db.query(models.User).filter(
-            models.User.department == dept,
-            models.User.role == schemas.Roles.TEACHER
-        ).order_by(models.User.created_at.asc()).first()
-        
-        hod_name = None
-        hod_id = None
-        if hod:
-            hod_name = f"{hod.first_name} {hod.last_name}"
-            hod_id = hod.id
-        
-        departments_data.append(schemas.DepartmentInfo(
-            department=dept.value if hasattr(dept, 'value') else dept,
-            head_of_department=hod_name,
-            head_of_department_id=hod_id,
-            total_teachers=total_teachers,
-            total_students=total_students
-        ))
+    """
+    Get information about each department including HOD.
+    
+    One query regardless of the number of departments: per-department counts
+    come from a GROUP BY, and the HOD is the teacher flagged is_hod, falling
+    back to the most senior teacher (earliest created_at) via ROW_NUMBER().
+    """
+    User = models.User
+    
+    counts = select(
+        User.department.label("department"),
+        _count_where(User.role == schemas.Roles.TEACHER).label("total_teachers"),
+        _count_where(User.role == schemas.Roles.STUDENT).label("total_students"),
+    ).where(
+        User.department.isnot(None)
+    ).group_by(User.department).subquery()
     
-    return departments_data
+    ranked_teachers = select(
+        User.id,
+        User.first_name,
+        User.last_name,
+        User.department,
+        func.row_number().over(
+            partition_by=User.department,
+            order_by=(case((User.is_hod == True, 0), else_=1), User.created_at, User.id)
+        ).label("rank"),
+    ).where(
+        User.role == schemas.Roles.TEACHER,
+        User.department.isnot(None)
+    ).subquery()
+    
+    rows = db.execute(
+        select(
+            counts.c.department,
+            counts.c.total_teachers,
+            counts.c.total_students,
+            ranked_teachers.c.id,
+            ranked_teachers.c.first_name,
+            ranked_teachers.c.last_name,
+        ).outerjoin(
+            ranked_teachers,
+            and_(ranked_teachers.c.department == counts.c.department, ranked_teachers.c.rank == 1)
+        ).order_by(counts.c.department)
+    ).all()
+    
+    return [
+        schemas.DepartmentInfo(
+            department=row.department.value if hasattr(row.department, 'value') else row.department,
+            head_of_department=f"{row.first_name} {row.last_name}" if row.id is not None else None,
+            head_of_department_id=row.id,
+            total_teachers=row.total_teachers,
+            total_students=row.total_students
+        )
+        for row in rows
+    ]
 
 
 def get_performance_trends(db: Session, months: int = 6) -> List[schemas.PerformanceTrend]:
     """
-    Get performance trends for the last N months.
+    Get performance trends for the last N months, newest first.
     
-    Note: This is a placeholder. You'll need to implement this based on your
-    grades/results table structure. For now, it returns sample data.
+    Read from the monthly grade rollup (see rollups.py), so the cost depends
+    on the number of months, subjects and grade levels, not on grades.
     """
+    if months <= 0:
+        return []
     
-    # TODO: Replace this with actual performance data from your grades table
-    # Example query structure:
-    # trends = db.query(
-    #     func.date_trunc('month', models.Grade.date).label('period'),
-    #     func.avg(models.Grade.score).label('average_score'),
-    #     func.count(models.Grade.student_id.distinct()).label('total_students')
-    # ).group_by('period').order_by(desc('period')).limit(months).all()
+    periods = [date.today().replace(day=1)]
+    while len(periods) < months:
+        periods.append((periods[-1] - timedelta(days=1)).replace(day=1))
     
-    trends = []
-    today = datetime.now()
+    rollup = models.GradeMonthlyRollup
+    members = models.GradeMonthlyStudent
+    
+    totals = select(
+        rollup.month,
+        func.sum(rollup.score_sum).label("score_sum"),
+        func.sum(rollup.score_count).label("score_count"),
+        func.sum(rollup.pass_count).label("pass_count"),
+    ).where(rollup.month >= periods[-1]).group_by(rollup.month).subquery()
+    
+    students = select(
+        members.month,
+        func.count(members.student_id.distinct()).label("total_students"),
+    ).where(members.month >= periods[-1]).group_by(members.month).subquery()
     
-    for i in range(months):
-        month_date = today - timedelta(days=30 * i)
-        period = month_date.strftime("%b %Y")
-        
-        # Placeholder data - replace with actual grades query
+    rows = db.execute(
+        select(totals, students.c.total_students).outerjoin(students, students.c.month == totals.c.month)
+    ).all()
+    by_month = {row.month: row for row in rows}
+    
+    trends = []
+    for month in periods:
+        row = by_month.get(month)
+        score_count = row.score_count if row is not None else 0
         trends.append(schemas.PerformanceTrend(
-            period=period,
-            average_score=0.0,  # Replace with actual average
-            total_students=0,   # Replace with actual count
-            pass_rate=0.0       # Replace with actual pass rate
+            period=month.strftime("%b %Y"),
+            average_score=round(row.score_sum / score_count, 2) if score_count else 0.0,
+            total_students=(row.total_students or 0) if row is not None else 0,
+            pass_rate=round(row.pass_count * 100.0 / score_count, 2) if score_count else 0.0
         ))
     
     return trends
 
 
-def get_recent_registrations(db: Session, days: int = 30) -> int:
+def get_recent_registrations(db: Session, days: int = 30, counters: Optional[UserCounters] = None) -> int:
     """Get number of students registered in the last N days."""
-    
-    cutoff_date = datetime.utcnow() - timedelta(days=days)
-    
-    recent_students = db.query(models.User).filter(
-        models.User.role == schemas.Roles.STUDENT,
-        models.User.created_at >= cutoff_date
-    ).count()
-    
-    return recent_students
+    counters = counters or get_user_counters(db, recent_days=days)
+    return counters.recent_students
 
 
-def calculate_teacher_student_ratio(db: Session) -> str:
+def calculate_teacher_student_ratio(db: Session, counters: Optional[UserCounters] = None) -> str:
     """Calculate teacher to student ratio."""
+    counters = counters or get_user_counters(db)
     
-    total_teachers = db.query(models.User).filter(
-        models.User.role == schemas.Roles.TEACHER,
-        models.User.is_active == True
-    ).count()
-    
-    total_students = db.query(models.User).filter(
-        models.User.role == schemas.Roles.STUDENT,
-        models.User.is_active == True
-    ).count()
-    
-    if total_teachers == 0:
+    if counters.active_teachers == 0:
         return "N/A"
     
-    ratio = total_students / total_teachers
+    ratio = counters.active_students / counters.active_teachers
     return f"1:{ratio:.0f}"
 
 
+@_dashboard_cache(DASHBOARD_TTL)
 def get_headteacher_dashboard(db: Session) -> schemas.HeadteacherDashboard:
     """Get complete dashboard data for headteacher."""
     
-    stats = get_dashboard_stats(db)
+    # Stats, ratio and recent registrations share one users scan
+    counters = get_user_counters(db)
+    stats = get_dashboard_stats(db, counters)
     departments = get_department_info(db)
     performance_trends = get_performance_trends(db)
-    recent_registrations = get_recent_registrations(db)
-    teacher_student_ratio = calculate_teacher_student_ratio(db)
+    recent_registrations = get_recent_registrations(db, counters=counters)
+    teacher_student_ratio = calculate_teacher_student_ratio(db, counters)
     
     return schemas.HeadteacherDashboard(
         stats=stats,
@@ -181,54 +307,174 @@ def get_headteacher_dashboard(db: Session) -> schemas.HeadteacherDashboard:
     )
 
 
-def get_teacher_statistics(db: Session, skip: int = 0, limit: int = 100) -> List[schemas.TeacherStats]:
-    """Get statistics for all teachers."""
+def _term_filters(model, academic_year: Optional[str], term: Optional[schemas.Term]) -> list:
+    """Conditions restricting a model with academic_year/term columns (Class, Grade)."""
+    conditions = []
+    if academic_year is not None:
+        conditions.append(model.academic_year == academic_year)
+    if term is not None:
+        conditions.append(model.term == term)
+    return conditions
+
+
+def get_teacher_statistics(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    academic_year: Optional[str] = None,
+    term: Optional[schemas.Term] = None
+) -> List[schemas.TeacherStats]:
+    """
+    Get statistics for a page of teachers, optionally for one academic year and term.
     
-    teachers = db.query(models.User).filter(
+    One query: the page of teachers is a CTE, and classes, enrollments and
+    grades are each aggregated per teacher in a derived table restricted to
+    the page, then outer-joined to it; aggregating them separately keeps enrollments and grades from
+    multiplying each other's rows.
+    """
+    
+    page = select(
+        models.User.id,
+        models.User.first_name,
+        models.User.last_name,
+        models.User.department,
+    ).where(
         models.User.role == schemas.Roles.TEACHER
-    ).offset(skip).limit(limit).all()
-    
-    teacher_stats = []
-    for teacher in teachers:
-        teacher_name = f"{teacher.first_name} {teacher.last_name}"
-        
-        # TODO: Add actual class and student counts from your classes table
-        # total_classes = db.query(models.Class).filter(
-        #     models.Class.teacher_id == teacher.id
-        # ).count()
-        
-        teacher_stats.append(schemas.TeacherStats(
-            teacher_id=teacher.id,
-            teacher_name=teacher_name,
-            department=teacher.department.value if teacher.department else None,
-            total_classes=0,  # Replace with actual count
-            total_students=0,  # Replace with actual count
-            average_performance=None  # Replace with actual performance data
-        ))
+    ).order_by(models.User.id).offset(skip).limit(limit).cte("teacher_page")
+    
+    in_page = [models.Class.teacher_id.in_(select(page.c.id)), *_term_filters(models.Class, academic_year, term)]
+    
+    class_counts = select(
+        models.Class.teacher_id,
+        func.count(models.Class.id).label("total_classes"),
+    ).where(*in_page).group_by(models.Class.teacher_id).subquery()
     
-    return teacher_stats
+    student_counts = select(
+        models.Class.teacher_id,
+        func.count(models.Enrollment.student_id.distinct()).label("total_students"),
+    ).join(models.Enrollment, models.Enrollment.class_id == models.Class.id).where(
+        *in_page, models.Enrollment.status != "dropped"
+    ).group_by(models.Class.teacher_id).subquery()
+    
+    performance = select(
+        models.Class.teacher_id,
+        func.avg(rollups.percent_expr()).label("average_performance"),
+    ).join(models.Grade, models.Grade.class_id == models.Class.id).where(
+        *in_page
+    ).group_by(models.Class.teacher_id).subquery()
+    
+    rows = db.execute(
+        select(
+            page,
+            func.coalesce(class_counts.c.total_classes, 0).label("total_classes"),
+            func.coalesce(student_counts.c.total_students, 0).label("total_students"),
+            performance.c.average_performance,
+        )
+        .outerjoin(class_counts, class_counts.c.teacher_id == page.c.id)
+        .outerjoin(student_counts, student_counts.c.teacher_id == page.c.id)
+        .outerjoin(performance, performance.c.teacher_id == page.c.id)
+        .order_by(page.c.id)
+    ).all()
+    
+    return [
+        schemas.TeacherStats(
+            teacher_id=row.id,
+            teacher_name=f"{row.first_name} {row.last_name}",
+            department=row.department.value if row.department else None,
+            total_classes=row.total_classes,
+            total_students=row.total_students,
+            average_performance=(
+                round(row.average_performance, 2) if row.average_performance is not None else None
+            )
+        )
+        for row in rows
+    ]
 
 
-def get_student_statistics(db: Session, skip: int = 0, limit: int = 100) -> List[schemas.StudentStats]:
-    """Get statistics for all students."""
+def get_student_statistics(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    academic_year: Optional[str] = None,
+    term: Optional[schemas.Term] = None
+) -> List[Dict]:
+    """
+    Get statistics for a page of students, as StudentStats-shaped dicts.
     
-    students = db.query(models.User).filter(
+    One query, built like get_teacher_statistics: per-student aggregates of
+    enrollments, grades and attendance restricted to the page CTE. The
+    grade level falls back to the student's classes when the user has none;
+    the attendance rate counts present and late over non-excused records.
+    """
+    
+    page = select(
+        models.User.id,
+        models.User.first_name,
+        models.User.last_name,
+        models.User.grade_level,
+    ).where(
         models.User.role == schemas.Roles.STUDENT
-    ).offset(skip).limit(limit).all()
-    
-    student_stats = []
-    for student in students:
-        student_name = f"{student.first_name} {student.last_name}"
-        
-        # TODO: Add actual subject count and performance from your enrollment/grades tables
-        
-        student_stats.append(schemas.StudentStats(
-            student_id=student.id,
-            student_name=student_name,
-            grade_level=None,  # Add grade_level field to User model if needed
-            total_subjects=0,  # Replace with actual count
-            average_score=None,  # Replace with actual average
-            attendance_rate=None  # Replace with actual attendance data
-        ))
+    ).order_by(models.User.id).offset(skip).limit(limit).cte("student_page")
+    
+    class_filters = _term_filters(models.Class, academic_year, term)
+    
+    enrolled = select(
+        models.Enrollment.student_id,
+        func.count(models.Class.subject_id.distinct()).label("total_subjects"),
+        func.max(models.Class.grade_level).label("class_grade_level"),
+    ).join(models.Class, models.Class.id == models.Enrollment.class_id).where(
+        models.Enrollment.student_id.in_(select(page.c.id)),
+        models.Enrollment.status != "dropped",
+        *class_filters
+    ).group_by(models.Enrollment.student_id).subquery()
+    
+    scores = select(
+        models.Grade.student_id,
+        func.avg(rollups.percent_expr()).label("average_score"),
+    ).where(
+        models.Grade.student_id.in_(select(page.c.id)),
+        *_term_filters(models.Grade, academic_year, term)
+    ).group_by(models.Grade.student_id).subquery()
+    
+    attendance = select(models.Attendance.student_id)
+    if class_filters:
+        # Attendance has no term of its own; take it from the class
+        attendance = attendance.join(models.Class, models.Class.id == models.Attendance.class_id)
+    attendance = attendance.add_columns(
+        _count_where(models.Attendance.status.in_([
+            models.AttendanceStatusEnum.PRESENT, models.AttendanceStatusEnum.LATE
+        ])).label("attended"),
+        _count_where(models.Attendance.status != models.AttendanceStatusEnum.EXCUSED).label("expected"),
+    ).where(
+        models.Attendance.student_id.in_(select(page.c.id)),
+        *class_filters
+    ).group_by(models.Attendance.student_id).subquery()
+    
+    rows = db.execute(
+        select(
+            page.c.id,
+            page.c.first_name,
+            page.c.last_name,
+            func.coalesce(page.c.grade_level, enrolled.c.class_grade_level).label("grade_level"),
+            func.coalesce(enrolled.c.total_subjects, 0).label("total_subjects"),
+            scores.c.average_score,
+            attendance.c.attended,
+            attendance.c.expected,
+        )
+        .outerjoin(enrolled, enrolled.c.student_id == page.c.id)
+        .outerjoin(scores, scores.c.student_id == page.c.id)
+        .outerjoin(attendance, attendance.c.student_id == page.c.id)
+        .order_by(page.c.id)
+    ).all()
     
-    return student_stats
\ No newline at end of file
+    return [
+        {
+            "student_id": row.id,
+            "student_name": f"{row.first_name} {row.last_name}",
+            "grade_level": row.grade_level,
+            "total_subjects": row.total_subjects,
+            "average_score": round(row.average_score, 2) if row.average_score is not None else None,
+            "attendance_rate": round(row.attended * 100.0 / row.expected, 2) if row.expected else None
+        }
+        for row in rows
+    ]
@@ -0,0 +1,140 @@
+"""
+Export Service - Streaming bulk export of the user directory
+
+Rows are read in batches through yield_per (a server-side cursor on
+PostgreSQL) and serialized one at a time, so memory use stays flat no
+matter how large the users table is.
+"""
+import csv
+import io
+import json
+import os
+import zlib
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from sqlalchemy import select
+
+import models
+import schemas
+from database import ReadSessionLocal
+
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+# Serialized bytes buffered before each write to the response
+EXPORT_CHUNK_BYTES = int(os.getenv("EXPORT_CHUNK_BYTES", "65536"))
+
+# Exported columns, named as in schemas.UserResponse
+EXPORT_COLUMNS = {
+    "id": models.User.id,
+    "email": models.User.email,
+    "first_name": models.User.first_name,
+    "last_name": models.User.last_name,
+    "gender": models.User.gender,
+    "phone": models.User.phone,
+    "date_of_birth": models.User.dob,
+    "address": models.User.address,
+    "role": models.User.role,
+    "department": models.User.department,
+    "is_active": models.User.is_active,
+    "is_verified": models.User.is_verified,
+    "created_at": models.User.created_at,
+    "last_seen_at": models.User.last_seen_at,
+}
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def iter_user_rows(
+    role: Optional[schemas.Roles] = None,
+    department: Optional[schemas.Departments] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield users as plain dicts in id order.
+    
+    Opens its own session: the generator runs after the request's
+    dependencies have been torn down.
+    """
+    query = select(*EXPORT_COLUMNS.values()).order_by(models.User.id)
+    if role is not None:
+        query = query.where(models.User.role == role)
+    if department is not None:
+        query = query.where(models.User.department == department)
+    
+    db = ReadSessionLocal()
+    try:
+        result = db.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for row in result:
+            yield {name: _plain(value) for name, value in zip(EXPORT_COLUMNS, row)}
+    finally:
+        db.close()
+
+
+def to_ndjson(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """One JSON object per line."""
+    for row in rows:
+        yield json.dumps(row, separators=(",", ":")) + "\n"
+
+
+def to_csv(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """CSV with a header line, one line per row."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow(row.values())
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, for an empty export
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def chunked(lines: Iterable[str], size: int = EXPORT_CHUNK_BYTES) -> Iterator[bytes]:
+    """Group small lines into writes of roughly size bytes."""
+    parts, pending = [], 0
+    for line in lines:
+        data = line.encode("utf-8")
+        parts.append(data)
+        pending += len(data)
+        if pending >= size:
+            yield b"".join(parts)
+            parts, pending = [], 0
+    if parts:
+        yield b"".join(parts)
+
+
+def gzipped(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Compress a byte stream into a single gzip member as it is produced."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_users(
+    export_format: str = "ndjson",
+    compress: bool = False,
+    role: Optional[schemas.Roles] = None,
+    department: Optional[schemas.Departments] = None
+) -> Iterator[bytes]:
+    """Byte stream of the user directory in the requested format."""
+    rows = iter_user_rows(role, department)
+    lines = to_csv(rows) if export_format == "csv" else to_ndjson(rows)
+    stream = chunked(lines)
+    return gzipped(stream) if compress else stream
@@ -2,11 +2,48 @@
 User Service - Shared business logic for user operations
 """
 from sqlalchemy.orm import Session
+import logging
 from fastapi import HTTPException, status
-from typing import Optional
+from typing import Iterable, Optional, Sequence
 import models
 import schemas
-from security import get_password_hash
+from database import SessionLocal
+import counters  # noqa: F401  (keeps dashboard_counters in step with User writes)
+from fieldsets import USER_FIELDS, user_columns, user_load_options
+from pagination import build_page, users_page_query
+from security import get_password_hash, invalidate_principal
+from services import dashboard_service
+
+
+logger = logging.getLogger(__name__)
+
+
+def build_user(user_data: schemas.CreateUser, hashed_password: str) -> models.User:
+    """Build a User from registration data; shared by the sync and async services."""
+    # Format address
+    address = None
+    if user_data.address:
+        address_parts = [
+            user_data.address.street,
+            user_data.address.village,
+            user_data.address.city,
+            user_data.address.postal_code,
+            user_data.address.country
+        ]
+        address = ", ".join([part for part in address_parts if part])
+    
+    return models.User(
+        email=user_data.email,
+        first_name=user_data.first_name,
+        last_name=user_data.last_name,
+        gender=user_data.gender,
+        dob=user_data.date_of_birth,
+        phone=user_data.phone,
+        address=address,
+        role=user_data.role,
+        department=user_data.department,
+        hashed_password=hashed_password
+    )
 
 
 def create_user(
@@ -39,43 +76,48 @@ def create_user(
             detail="User with this email already exists"
         )
     
-    # Format address
-    address = None
-    if user_data.address:
-        address_parts = [
-            user_data.address.street,
-            user_data.address.village,
-            user_data.address.city,
-            user_data.address.postal_code,
-            user_data.address.country
-        ]
-        address = ", ".join([part for part in address_parts if part])
-    
     # Hash password
     hashed_password = get_password_hash(user_data.password)
     
     # Create user object
-    new_user = models.User(
-        email=user_data.email,
-        first_name=user_data.first_name,
-        last_name=user_data.last_name,
-        gender=user_data.gender,
-        dob=user_data.date_of_birth,
-        phone=user_data.phone,
-        address=address,
-        role=user_data.role,
-        department=user_data.department,
-        hashed_password=hashed_password
-    )
+    new_user = build_user(user_data, hashed_password)
     
     # Add to database
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
+    dashboard_service.invalidate_dashboard_cache()
     
     return new_user
 
 
+def rehash_password(user_id: int, old_hash: str, password: str) -> None:
+    """
+    Re-hash a password with the current bcrypt cost after a successful login.
+    
+    Runs as a background task with its own session. The update only applies
+    if the stored hash is unchanged, so a concurrent password change wins.
+    """
+    try:
+        new_hash = get_password_hash(password)
+    except HTTPException:
+        # Hashing pool is saturated; the next login will try again
+        return
+    
+    db = SessionLocal()
+    try:
+        db.query(models.User).filter(
+            models.User.id == user_id,
+            models.User.hashed_password == old_hash
+        ).update({models.User.hashed_password: new_hash}, synchronize_session=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Failed to rehash password for user %s", user_id)
+    finally:
+        db.close()
+
+
 def get_user_by_id(db: Session, user_id: int) -> Optional[models.User]:
     """Get user by ID."""
     return db.query(models.User).filter(models.User.id == user_id).first()
@@ -86,16 +128,54 @@ def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
     return db.query(models.User).filter(models.User.email == email).first()
 
 
-def get_all_users(db: Session, skip: int = 0, limit: int = 100):
-    """Get all users with pagination."""
-    return db.query(models.User).offset(skip).limit(limit).all()
+def list_users(
+    db: Session,
+    roles: Optional[Iterable[schemas.Roles]] = None,
+    department: Optional[schemas.Departments] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None
+) -> dict:
+    """
+    Get one keyset page of users, optionally filtered by role and department.
+    With fields, only those columns are loaded (see fieldsets.py).
+    """
+    query = users_page_query(roles, department, cursor, limit)
+    if fields:
+        query = query.options(user_load_options(fields))
+    rows = db.scalars(query).all()
+    return build_page(rows, limit)
+
+
+def list_user_rows(
+    db: Session,
+    roles: Optional[Iterable[schemas.Roles]] = None,
+    department: Optional[schemas.Departments] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None
+) -> dict:
+    """
+    Same page as list_users, with items as plain dicts read from row tuples.
+    No ORM objects or Pydantic models are built; for ORJSONResponse fast paths.
+    """
+    names = fields or tuple(USER_FIELDS)
+    rows = db.execute(users_page_query(roles, department, cursor, limit, user_columns(fields))).all()
+    page = build_page(rows, limit)
+    page["items"] = [{name: row._mapping[name] for name in names} for row in page["items"]]
+    return page
 
 
-def get_users_by_role(db: Session, role: schemas.Roles, skip: int = 0, limit: int = 100):
-    """Get users by role with pagination."""
-    return db.query(models.User).filter(
-        models.User.role == role
-    ).offset(skip).limit(limit).all()
+def get_users_by_role(
+    db: Session,
+    role: schemas.Roles,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    department: Optional[schemas.Departments] = None,
+    fields: Optional[Sequence[str]] = None
+) -> dict:
+    """Get one keyset page of users with the given role."""
+    return list_users(db, [role], department, cursor, limit, fields)
 
 
 def update_user(db: Session, user_id: int, user_data: dict) -> models.User:
@@ -113,6 +193,8 @@ def update_user(db: Session, user_id: int, user_data: dict) -> models.User:
     
     db.commit()
     db.refresh(user)
+    invalidate_principal(user.id)
+    dashboard_service.invalidate_dashboard_cache()
     return user
 
 
@@ -128,6 +210,8 @@ def deactivate_user(db: Session, user_id: int) -> models.User:
     user.is_active = False
     db.commit()
     db.refresh(user)
+    invalidate_principal(user.id)
+    dashboard_service.invalidate_dashboard_cache()
     return user
 
 
@@ -143,4 +227,6 @@ def activate_user(db: Session, user_id: int) -> models.User:
     user.is_active = True
     db.commit()
     db.refresh(user)
+    invalidate_principal(user.id)
+    dashboard_service.invalidate_dashboard_cache()
     return user
\ No newline at end of file
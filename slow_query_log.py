@@ -0,0 +1,269 @@
+"""
+Slow-query log.
+
+Statements slower than SLOW_QUERY_MS are normalized into a fingerprint
+(literals and bind placeholders replaced, IN lists collapsed) and kept in a
+bounded ring buffer with their bind shapes, the route that issued them and,
+for SELECTs, the EXPLAIN output. Per-fingerprint totals back the top-N
+views on the internal admin endpoint.
+
+EXPLAIN never runs on the request's connection: the first slow execution of
+a fingerprint is queued, and a background thread explains it on its own
+pooled connection, so a failing EXPLAIN cannot abort the caller's
+transaction or add to the slow request's latency. Engines on async drivers
+record statements without plans.
+"""
+import hashlib
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from query_stats import current_query_stats
+
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_BUFFER = int(os.getenv("SLOW_QUERY_BUFFER", "500"))
+SLOW_QUERY_MAX_FINGERPRINTS = int(os.getenv("SLOW_QUERY_MAX_FINGERPRINTS", "1000"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() in ("1", "true", "yes")
+# Statements waiting to be explained; beyond this, new ones go unexplained
+SLOW_QUERY_EXPLAIN_QUEUE = int(os.getenv("SLOW_QUERY_EXPLAIN_QUEUE", "100"))
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+|:\w+|\?")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"\bVALUES\s*(\([^()]*\))(?:\s*,\s*\([^()]*\))+", re.IGNORECASE)
+
+
+def fingerprint(statement: str) -> str:
+    """Normalize a statement so executions differing only in values group together."""
+    normalized = " ".join(statement.split())
+    normalized = _STRING_LITERAL.sub("?", normalized)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _IN_LIST.sub("IN (?+)", normalized)
+    normalized = _VALUES_LIST.sub(r"VALUES \1, ...", normalized)
+    return normalized
+
+
+def fingerprint_key(normalized: str) -> str:
+    """Short stable id for a fingerprint."""
+    return hashlib.md5(normalized.encode("utf-8")).hexdigest()[:12]
+
+
+def bind_shape(parameters: Any, executemany: bool = False) -> Any:
+    """Types of the bound parameters, without their values."""
+    if executemany and parameters:
+        return {"rows": len(parameters), "row": bind_shape(parameters[0])}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+class SlowQueryLog:
+    """Ring buffer of slow statements plus per-fingerprint aggregates."""
+
+    def __init__(
+        self,
+        threshold_ms: float = SLOW_QUERY_MS,
+        buffer_size: int = SLOW_QUERY_BUFFER,
+        max_fingerprints: int = SLOW_QUERY_MAX_FINGERPRINTS
+    ):
+        self.threshold_ms = threshold_ms
+        self.max_fingerprints = max_fingerprints
+        self._recent = deque(maxlen=buffer_size)
+        self._aggregates: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def needs_plan(self, key: str) -> bool:
+        with self._lock:
+            entry = self._aggregates.get(key)
+            return entry is None or entry["plan"] is None
+
+    def set_plan(self, key: str, plan: List[str]) -> None:
+        with self._lock:
+            entry = self._aggregates.get(key)
+            if entry is not None:
+                entry["plan"] = plan
+
+    def record(
+        self,
+        statement: str,
+        duration_ms: float,
+        shape: Any,
+        route: Optional[str],
+        plan: Optional[List[str]] = None,
+        normalized: Optional[str] = None
+    ) -> str:
+        """Record one slow execution; returns its fingerprint key."""
+        normalized = normalized if normalized is not None else fingerprint(statement)
+        key = fingerprint_key(normalized)
+
+        with self._lock:
+            self._recent.append({
+                "fingerprint": key,
+                "statement": " ".join(statement.split()),
+                "duration_ms": round(duration_ms, 2),
+                "bind_shape": shape,
+                "route": route,
+                "recorded_at": datetime.utcnow().isoformat(),
+            })
+
+            entry = self._aggregates.get(key)
+            if entry is None:
+                entry = {
+                    "fingerprint": key,
+                    "normalized": normalized,
+                    "calls": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "routes": Counter(),
+                    "plan": None,
+                }
+                self._aggregates[key] = entry
+                while len(self._aggregates) > self.max_fingerprints:
+                    self._aggregates.popitem(last=False)
+            else:
+                self._aggregates.move_to_end(key)
+
+            entry["calls"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            if route:
+                entry["routes"][route] += 1
+            if plan is not None:
+                entry["plan"] = plan
+        return key
+
+    def top(self, limit: int = 20, order_by: str = "total_ms") -> List[Dict[str, Any]]:
+        """Fingerprints ordered by total_ms, max_ms or calls."""
+        with self._lock:
+            entries = sorted(self._aggregates.values(), key=lambda e: e[order_by], reverse=True)[:limit]
+            return [
+                {
+                    **entry,
+                    "total_ms": round(entry["total_ms"], 2),
+                    "max_ms": round(entry["max_ms"], 2),
+                    "avg_ms": round(entry["total_ms"] / entry["calls"], 2),
+                    "routes": dict(entry["routes"].most_common(5)),
+                }
+                for entry in entries
+            ]
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent slow statements, newest first."""
+        with self._lock:
+            return list(self._recent)[-limit:][::-1]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._recent.clear()
+            self._aggregates.clear()
+
+
+slow_query_log = SlowQueryLog()
+
+
+def _explain(connection, statement: str, parameters: Any) -> Optional[List[str]]:
+    """Plan for a SELECT, run on a raw cursor of the given (side) connection."""
+    if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+
+    prefix = "EXPLAIN QUERY PLAN " if connection.dialect.name == "sqlite" else "EXPLAIN "
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [" ".join(str(col) for col in row) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+class PlanCapture:
+    """Background thread that explains queued slow statements on its own connection."""
+
+    def __init__(self, engine: Engine, log: SlowQueryLog, queue_size: int = SLOW_QUERY_EXPLAIN_QUEUE):
+        self.engine = engine
+        self.log = log
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._pending: set = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, key: str, statement: str, parameters: Any) -> None:
+        """Queue a statement for EXPLAIN unless it is already queued or the queue is full."""
+        with self._lock:
+            if key in self._pending:
+                return
+            try:
+                self._queue.put_nowait((key, statement, parameters))
+            except queue.Full:
+                return
+            self._pending.add(key)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="slow-query-explain", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            key, statement, parameters = self._queue.get()
+            try:
+                # Leaving the block rolls the side connection back and returns it to the pool
+                with self.engine.connect() as connection:
+                    plan = _explain(connection, statement, parameters)
+                if plan is not None:
+                    self.log.set_plan(key, plan)
+            except Exception:
+                logger.debug("Could not EXPLAIN slow statement", exc_info=True)
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+
+def install(engine: Engine, log: SlowQueryLog = slow_query_log) -> None:
+    """Record slow statements executed through engine."""
+    # Async drivers cannot be driven from the capture thread; their statements go unexplained
+    planner = PlanCapture(engine, log) if SLOW_QUERY_EXPLAIN and not engine.dialect.is_async else None
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._slow_query_started_at = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started_at = getattr(context, "_slow_query_started_at", None)
+        if started_at is None:
+            return
+        duration_ms = (time.perf_counter() - started_at) * 1000
+        if duration_ms < log.threshold_ms:
+            return
+
+        stats = current_query_stats()
+        normalized = fingerprint(statement)
+        key = fingerprint_key(normalized)
+        needs_plan = planner is not None and not executemany and log.needs_plan(key)
+
+        log.record(
+            statement,
+            duration_ms,
+            bind_shape(parameters, executemany),
+            stats.route if stats is not None else None,
+            normalized=normalized
+        )
+        if needs_plan:
+            planner.submit(key, statement, parameters)
@@ -1,7 +1,9 @@
-from fastapi import HTTPException, status, Depends, APIRouter
+from fastapi import HTTPException, status, Depends, APIRouter, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from database import get_db
+from database import get_db, get_read_db
+from fieldsets import parse_fields, render_user_page
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 import schemas
 import models
 from security import get_password_hash
@@ -23,13 +25,20 @@ def createUser(
     return user_service.create_user(db, user)
 
 
-@router.get('/getUsers', response_model=List[schemas.UserResponse])
+@router.get('/getUsers', response_model=schemas.UserPage)
 def getUsers(
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    role: Optional[schemas.Roles] = None,
+    department: Optional[schemas.Departments] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated UserResponse fields to return"),
+    db: Session = Depends(get_read_db)
 ):
-    """Get all users from the database."""
-    users = db.query(models.User).all()
-    return users
+    """Get users one page at a time, optionally filtered by role and department."""
+    roles = [role] if role else None
+    fieldset = parse_fields(fields)
+    page = user_service.list_users(db, roles, department, cursor, limit, fieldset)
+    return render_user_page(page, fieldset)
 
 
 @router.get('/getUser/{user_id}', response_model=schemas.UserResponse)
@@ -0,0 +1,58 @@
+"""
+Users routes served through the async database stack.
+Enabled instead of users.py when "users" is listed in ASYNC_ROUTERS.
+"""
+from fastapi import HTTPException, status, Depends, APIRouter, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from database import get_async_db
+from fieldsets import parse_fields, render_user_page
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+import schemas
+from services import async_user_service
+
+
+router = APIRouter(
+    prefix="/users",
+    tags=['users']
+)
+
+
+@router.post('/register', response_model=schemas.UserResponse, status_code=status.HTTP_201_CREATED)
+async def createUser(
+    user: schemas.CreateUser,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Public user registration endpoint."""
+    return await async_user_service.create_user(db, user)
+
+
+@router.get('/getUsers', response_model=schemas.UserPage)
+async def getUsers(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    role: Optional[schemas.Roles] = None,
+    department: Optional[schemas.Departments] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated UserResponse fields to return"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get users one page at a time, optionally filtered by role and department."""
+    roles = [role] if role else None
+    fieldset = parse_fields(fields)
+    page = await async_user_service.list_users(db, roles, department, cursor, limit, fieldset)
+    return render_user_page(page, fieldset)
+
+
+@router.get('/getUser/{user_id}', response_model=schemas.UserResponse)
+async def getUser(
+    user_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a single user by ID."""
+    user = await async_user_service.get_user_by_id(db, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User with id {user_id} not found"
+        )
+    return user